@@ -0,0 +1,240 @@
+"""Benchmark the integration's hot paths against a synthetic fleet.
+
+Run from the repository root with Home Assistant installed:
+
+    python -m benchmarks.run --bikes 300 --spares 2000
+
+Everything talks to a local aiohttp stub of the Intervals.icu gear
+endpoints, so numbers include real HTTP and JSON decoding but no network.
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+import tracemalloc
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+
+from custom_components.intervals_icu_gear.api import IntervalsICUClient
+from custom_components.intervals_icu_gear.const import DEFAULT_WEAR_LIMITS
+from custom_components.intervals_icu_gear.coordinator import IntervalsICUGearCoordinator
+from custom_components.intervals_icu_gear.forecast import WearForecaster
+from custom_components.intervals_icu_gear.models import GearIndex
+from custom_components.intervals_icu_gear.sensor import _build_entities
+from custom_components.intervals_icu_gear.services import _async_get_snapshot, _equip_mutation
+from custom_components.intervals_icu_gear.stats import PerfStats
+from custom_components.intervals_icu_gear.writes import BikeWriteCoalescer
+
+from .stub_server import StubIntervalsServer
+from .synthetic import generate_fleet, record_ride
+
+PROPERTIES = ("native_value", "extra_state_attributes", "device_info")
+
+
+def _render(entity):
+    """Evaluate what Home Assistant reads when writing an entity's state."""
+    return (entity.native_value, entity.extra_state_attributes, entity.device_info)
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+class _Run:
+    """Wires entities to the coordinator and counts state writes."""
+
+    def __init__(self, coordinator, entities):
+        self.writes = 0
+        self.entities = entities
+        for entity in entities:
+            # Count writes and evaluate the state instead of touching hass
+            entity.async_write_ha_state = self._make_writer(entity)
+            coordinator.async_add_listener(entity._handle_coordinator_update)
+
+    def _make_writer(self, entity):
+        def _write():
+            self.writes += 1
+            _render(entity)
+        return _write
+
+
+async def _async_timed(coro):
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+
+async def async_run(args):
+    gear = generate_fleet(args.bikes, args.spares, retired=args.retired, unused=args.unused)
+    server = StubIntervalsServer(gear)
+    url = await server.start()
+    results = {
+        "fleet": {
+            "bikes": args.bikes,
+            "gear_items": len(gear),
+            "components": sum(1 for g in gear if g["component"]),
+            "retired_bikes": args.retired,
+            "unused_spares": args.unused,
+        }
+    }
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        async with aiohttp.ClientSession() as session:
+            stats = PerfStats()
+            client = IntervalsICUClient(
+                session, "bench", server.athlete_id, api_url=url, stats=stats
+            )
+            forecaster = WearForecaster(hass, "bench", dict(DEFAULT_WEAR_LIMITS))
+            coordinator = IntervalsICUGearCoordinator(
+                hass, client, "bench", forecaster=forecaster, stats=stats
+            )
+
+            # Setup: first refresh, entity construction and first state render
+            server.reset_counters()
+            start = time.perf_counter()
+            await coordinator.async_refresh()
+            fetched = time.perf_counter()
+            entities = _build_entities(coordinator)
+            built = time.perf_counter()
+            for entity in entities:
+                _render(entity)
+                # What async_added_to_hass does after the initial write
+                entity._remember_written_state()
+            rendered = time.perf_counter()
+            results["setup"] = {
+                "entities": len(entities),
+                "first_refresh_ms": _ms(fetched - start),
+                "build_entities_ms": _ms(built - fetched),
+                "first_render_ms": _ms(rendered - built),
+                "total_ms": _ms(rendered - start),
+                "http_requests": server.total_requests,
+                "response_bytes": server.bytes_sent,
+            }
+
+            run = _Run(coordinator, entities)
+
+            # Refresh with identical data: should write nothing
+            server.reset_counters()
+            elapsed = await _async_timed(coordinator.async_refresh())
+            results["refresh_unchanged"] = {
+                "latency_ms": _ms(elapsed),
+                "state_writes": run.writes,
+                "http_requests": server.total_requests,
+            }
+
+            # Refresh after one ride: only the bike and its components change
+            run.writes = 0
+            server.reset_counters()
+            record_ride(server.gear, next(g["id"] for g in server.gear if not g["component"]))
+            elapsed = await _async_timed(coordinator.async_refresh())
+            results["refresh_after_ride"] = {
+                "latency_ms": _ms(elapsed),
+                "state_writes": run.writes,
+                "http_requests": server.total_requests,
+            }
+
+            # Equip: the service's path below device lookup (snapshot check,
+            # the per-bike write queue, PUT and local patch)
+            writes = BikeWriteCoalescer(hass, coordinator, client)
+            index = coordinator.data
+            bike = next(g for g in index if g.get("type") == "Bike")
+            spare = next(
+                g for g in index.by_type.get("Chain", ())
+                if index.equipped_on(g["id"]) is None
+            )
+            run.writes = 0
+            server.reset_counters()
+            start = time.perf_counter()
+            await _async_get_snapshot(coordinator, (bike["id"], spare["id"]))
+            status, _, _ = await writes.async_apply(
+                bike["id"], _equip_mutation(bike["id"], spare["id"], True)
+            )
+            results["equip"] = {
+                "status": status,
+                "latency_ms": _ms(time.perf_counter() - start),
+                "state_writes": run.writes,
+                "http_requests": server.total_requests,
+            }
+
+            # Per-entity property cost, by entity class
+            per_class = {}
+            for entity in entities:
+                per_class.setdefault(type(entity).__name__, []).append(entity)
+            results["property_cost_us"] = {}
+            for name, group in per_class.items():
+                costs = {}
+                for prop in PROPERTIES:
+                    start = time.perf_counter()
+                    for _ in range(args.repeat):
+                        for entity in group:
+                            getattr(entity, prop)
+                    costs[prop] = round(
+                        (time.perf_counter() - start) / (args.repeat * len(group)) * 1e6, 2
+                    )
+                results["property_cost_us"][name] = costs
+
+            # Memory held by one snapshot and by the entity objects
+            # The decoded payload counts too, unless the index lets it go
+            payload = json.dumps(server.gear)
+            tracemalloc.start()
+            raw = json.loads(payload)
+            snapshot = GearIndex(raw)
+            del raw
+            index_bytes = tracemalloc.get_traced_memory()[0]
+            coordinator.data = snapshot
+            more = _build_entities(coordinator)
+            entity_bytes = tracemalloc.get_traced_memory()[0] - index_bytes
+            tracemalloc.stop()
+            results["memory_kib"] = {
+                "index": round(index_bytes / 1024, 1),
+                "entities": round(entity_bytes / 1024, 1),
+                "per_entity": round(entity_bytes / 1024 / max(len(more), 1), 2),
+            }
+
+            # What the integration's own instrumentation saw during the run
+            perf = stats.as_dict()
+            results["instrumentation"] = {
+                "requests": perf["requests"],
+                "refreshes": perf["refreshes"],
+                "last_json_decode_ms": perf["last_json_decode_ms"],
+                "last_gear_parse_ms": perf["last_gear_parse_ms"],
+                "last_index_build_ms": perf["last_index_build_ms"],
+                "entity_writes_total": perf["entity_writes_total"],
+                "errors": perf["errors"],
+            }
+
+            await coordinator.async_shutdown()
+        await hass.async_stop(force=True)
+    await server.stop()
+    return results
+
+
+def _print(results):
+    for section, values in results.items():
+        print(section)
+        for key, value in values.items():
+            print(f"  {key}: {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bikes", type=int, default=200)
+    parser.add_argument("--spares", type=int, default=1000)
+    parser.add_argument("--retired", type=int, default=0, help="Retired bikes in the fleet")
+    parser.add_argument("--unused", type=int, default=0, help="Spares never ridden")
+    parser.add_argument("--repeat", type=int, default=20, help="Property cost repetitions")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(async_run(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Local stand-in for the Intervals.icu gear endpoints."""
+import json
+from aiohttp import web
+
+
+class StubIntervalsServer:
+    """Serves ``/gear`` and ``/gear/{id}`` from an in-memory gear list.
+
+    Counts requests per route so benchmarks can report HTTP round trips.
+    """
+
+    def __init__(self, gear, athlete_id="i1"):
+        self.gear = gear
+        self.athlete_id = athlete_id
+        self.requests = {}
+        self.bytes_sent = 0
+        self._runner = None
+        self.url = None
+
+        app = web.Application()
+        app.router.add_get("/api/v1/athlete/{athlete}/gear", self._get_gear)
+        app.router.add_put("/api/v1/athlete/{athlete}/gear/{gear_id}", self._put_gear)
+        app.router.add_get("/api/v1/athlete/{athlete}/activities", self._get_activities)
+        self.app = app
+
+    def _count(self, route):
+        self.requests[route] = self.requests.get(route, 0) + 1
+
+    def _json(self, data):
+        body = json.dumps(data).encode()
+        self.bytes_sent += len(body)
+        return web.Response(body=body, content_type="application/json")
+
+    async def _get_gear(self, request):
+        self._count("GET /gear")
+        return self._json(self.gear)
+
+    async def _put_gear(self, request):
+        self._count("PUT /gear/{id}")
+        gear_id = request.match_info["gear_id"]
+        payload = await request.json()
+        for g in self.gear:
+            if g["id"] == gear_id:
+                g["component_ids"] = payload.get("component_ids", g.get("component_ids"))
+                return self._json(g)
+        raise web.HTTPNotFound()
+
+    async def _get_activities(self, request):
+        self._count("GET /activities")
+        return self._json([])
+
+    def reset_counters(self):
+        self.requests = {}
+        self.bytes_sent = 0
+
+    @property
+    def total_requests(self):
+        return sum(self.requests.values())
+
+    async def start(self, host="127.0.0.1", port=0):
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}/api/v1"
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
@@ -0,0 +1,86 @@
+"""Synthetic Intervals.icu gear fleets for benchmarking."""
+import random
+
+# Component types fitted to every bike, with the number of slots per type
+BIKE_LAYOUT = {
+    "Chain": 1,
+    "Cassette": 1,
+    "Chainrings": 1,
+    "Tyre": 2,
+    "Tube": 2,
+    "Wheel": 2,
+    "BrakePads": 2,
+    "Rotor": 2,
+    "Cable": 3,
+    "Saddle": 1,
+    "Pedals": 1,
+    "PowerMeter": 1,
+}
+
+SPARE_TYPES = ["Chain", "Tyre", "Cassette", "BrakePads", "Tube"]
+
+
+def generate_fleet(bikes=200, spares=1000, seed=1, retired=0, unused=0):
+    """Return a gear list shaped like the ``/gear`` endpoint's response.
+
+    Every bike carries the components in BIKE_LAYOUT (several slots for
+    tyres, wheels, brake pads, ...); spares are unmounted components.
+    The first ``retired`` bikes are retired and ``unused`` of the spares
+    have never been ridden.
+    """
+    rng = random.Random(seed)
+    gear = []
+    counter = 0
+
+    def _component(comp_type, distance):
+        nonlocal counter
+        counter += 1
+        return {
+            "id": f"c{counter:06d}",
+            "name": f"{comp_type} {counter}",
+            "type": comp_type,
+            "component": True,
+            "distance": distance,
+            "time": int(distance / 8),
+            "activities": int(distance / 40000),
+            "component_ids": None,
+            "retired": None,
+        }
+
+    for b in range(bikes):
+        bike_distance = rng.randint(1_000_000, 40_000_000)
+        component_ids = []
+        for comp_type, slots in BIKE_LAYOUT.items():
+            for _ in range(slots):
+                comp = _component(comp_type, rng.randint(0, bike_distance))
+                gear.append(comp)
+                component_ids.append(comp["id"])
+        gear.append({
+            "id": f"b{b:05d}",
+            "name": f"Bike {b}",
+            "type": "Bike",
+            "component": False,
+            "distance": bike_distance,
+            "time": int(bike_distance / 8),
+            "activities": int(bike_distance / 40000),
+            "component_ids": component_ids,
+            "retired": "2020-01-01" if b < retired else None,
+        })
+
+    for s in range(spares):
+        distance = 0 if s < unused else rng.randint(0, 5_000_000)
+        gear.append(_component(rng.choice(SPARE_TYPES), distance))
+
+    rng.shuffle(gear)
+    return gear
+
+
+def record_ride(gear, bike_id, distance=42_000):
+    """Add a ride to a bike and its components, in place."""
+    by_id = {g["id"]: g for g in gear}
+    bike = by_id[bike_id]
+    for gid in [bike_id, *(bike.get("component_ids") or [])]:
+        item = by_id[gid]
+        item["distance"] = (item.get("distance") or 0) + distance
+        item["time"] = (item.get("time") or 0) + distance // 8
+        item["activities"] = (item.get("activities") or 0) + 1
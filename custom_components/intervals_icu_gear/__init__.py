@@ -1,114 +1,200 @@
 # Intervals.icu Gear Home Assistant Integration
 
+from datetime import timedelta
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.typing import ConfigType
-import voluptuous as vol
-from homeassistant.helpers import config_validation as cv, device_registry as dr
-from .const import CONF_API_KEY, CONF_ATHLETE_ID, DOMAIN
-from .api import IntervalsICUClient
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from .const import (
+    CONF_ACTIVITY_SYNC,
+    CONF_API_KEY,
+    CONF_ATHLETE_ID,
+    CONF_COMPACT_ATTRIBUTES,
+    CONF_INCLUDE_INACTIVE,
+    CONF_MAX_CACHE_AGE,
+    CONF_MAX_CONNECTIONS,
+    CONF_QUEUED_COMMANDS,
+    CONF_REQUEST_TIMEOUT,
+    CONF_STATISTICS,
+    CONF_TIME_LIMITS,
+    CONF_WEAR_LIMITS,
+    CONF_WEBHOOK,
+    CONF_WEBHOOK_ID,
+    CONF_WEBHOOK_SECRET,
+    DATA_RATE_LIMITS,
+    DATA_REQUEST_BUDGET,
+    DEFAULT_MAX_CACHE_AGE,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_REQUEST_TIMEOUT,
+    DEFAULT_WEAR_LIMITS,
+    DOMAIN,
+    STAGGER_MINUTES,
+)
+from .api import IntervalsICUClient, RequestBudget, TokenBucket, split_athlete_ids
+from .coordinator import IntervalsICUGearCoordinator, snapshot_store
+from .entity import async_register_athlete_devices, async_track_gear_devices
+from .forecast import WearForecaster, parse_limits, wear_store
+from .journal import CommandJournal, journal_store
+from .ledger import InstallLedger, ledger_store
+from .scheduler import DEFAULT_INTERVAL
+from .stats import PerfStats
+from .thresholds import ThresholdEvaluator
+from .usage import UsageStore, usage_store
+from .writes import BikeWriteCoalescer
+from .services import async_register_services
+from .webhook import async_setup_webhook
+from .websocket import async_register_websocket_commands
 import logging
 
 _LOGGER = logging.getLogger(__name__)
 
-EQUIP_SERVICE = "equip_component"
+PLATFORMS = ["sensor", "binary_sensor"]
 
-EQUIP_SCHEMA = vol.Schema({
-    vol.Required("bike_device_id"): cv.string,
-    vol.Required("component_device_id"): cv.string,
-    vol.Optional("exclusive", default=False): bool,
-})
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    hass.data.setdefault(DOMAIN, {})
+    # Services are shared by all entries and route calls by device
+    async_register_services(hass)
+    async_register_websocket_commands(hass)
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Initialize hass.data for this domain
     hass.data.setdefault(DOMAIN, {})
+    budget = hass.data.setdefault(DATA_REQUEST_BUDGET, RequestBudget())
+    rate_limit = hass.data.setdefault(DATA_RATE_LIMITS, {}).setdefault(
+        entry.data[CONF_API_KEY], TokenBucket()
+    )
+    stats = PerfStats()
+    # Several comma-separated athletes turn on coach mode
+    athlete_ids = split_athlete_ids(entry.data[CONF_ATHLETE_ID])
+    coach_mode = len(athlete_ids) > 1
+
+    # One pooled client per entry, shared by the coordinator and the services
+    client = IntervalsICUClient(
+        async_get_clientsession(hass),
+        entry.data[CONF_API_KEY],
+        athlete_ids[0],
+        timeout=entry.options.get(CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT),
+        max_connections=entry.options.get(CONF_MAX_CONNECTIONS, DEFAULT_MAX_CONNECTIONS),
+        budget=budget,
+        rate_limit=rate_limit,
+        stats=stats,
+    )
+    # Shared reads run as their own tasks and would outlive the entry
+    entry.async_on_unload(client.cancel_requests)
+
+    usage = None
+    # Activity sync reads one athlete's activities, so coach mode skips it
+    if entry.options.get(CONF_ACTIVITY_SYNC, False) and not coach_mode:
+        usage = UsageStore(hass, entry.entry_id)
+        await usage.async_load()
+
+    if CONF_WEAR_LIMITS in entry.options:
+        limits = parse_limits(entry.options[CONF_WEAR_LIMITS])
+    else:
+        limits = dict(DEFAULT_WEAR_LIMITS)
+    forecaster = WearForecaster(hass, entry.entry_id, limits)
+    await forecaster.async_load()
+    # Wear limits double as the distance limits of the wear binary sensors
+    thresholds = ThresholdEvaluator(
+        limits, parse_limits(entry.options.get(CONF_TIME_LIMITS, ""))
+    )
 
-    await hass.config_entries.async_forward_entry_setups(entry, ["sensor"])
-
-    async def async_equip_component_service(call):
-        api_key = entry.data[CONF_API_KEY]
-        athlete_id = entry.data[CONF_ATHLETE_ID]
-
-        bike_device_id = call.data["bike_device_id"]
-        component_device_id = call.data["component_device_id"]
-        exclusive = call.data.get("exclusive", False)
-
-        # Get device registry to resolve device IDs to gear IDs
-        device_reg = dr.async_get(hass)
-
-        bike_device = device_reg.async_get(bike_device_id)
-        comp_device = device_reg.async_get(component_device_id)
-
-        if not bike_device or not comp_device:
-            raise ValueError("Bike or component device not found")
-
-        # Extract gear_id from device identifiers
-        # Identifiers are stored as {(DOMAIN, gear_id)}
-        bike_gear_id = None
-        comp_gear_id = None
-
-        for domain, identifier in bike_device.identifiers:
-            if domain == DOMAIN:
-                bike_gear_id = identifier
-                break
-
-        for domain, identifier in comp_device.identifiers:
-            if domain == DOMAIN:
-                comp_gear_id = identifier
-                break
-
-        if not bike_gear_id or not comp_gear_id:
-            raise ValueError("Could not resolve gear IDs from device identifiers")
-
-        client = IntervalsICUClient(api_key, athlete_id)
-        # 1. Fetch all gear
-        gear_list = await client.async_get_gear()
-        # 2. Find bike and component by id
-        gear_by_id = {g["id"]: g for g in gear_list}
-        bike = gear_by_id.get(bike_gear_id)
-        component = gear_by_id.get(comp_gear_id)
-        if not bike or not component:
-            raise ValueError("Bike or component not found in Intervals.icu gear list")
-        bike_id = bike["id"]
-        existing_component_ids = bike.get("component_ids") or []
-        component_id = component["id"]
-        component_type = component.get("type")
-        # 4. Build new component_ids
-        new_component_ids = list(existing_component_ids)
-        if exclusive:
-            filtered = []
-            for cid in new_component_ids:
-                g = gear_by_id.get(cid)
-                if not g or g.get("type") != component_type:
-                    filtered.append(cid)
-            new_component_ids = filtered
-        if component_id not in new_component_ids:
-            new_component_ids.append(component_id)
-        # 5. PUT update
-        await client.async_update_bike_components(bike_id, new_component_ids)
-
-        # 6. Refresh coordinator data to update all entities
-        coordinator = hass.data[DOMAIN].get("coordinator")
-        if coordinator:
-            _LOGGER.info("Refreshing coordinator data after equipping component")
-            await coordinator.async_refresh()
-            _LOGGER.info("Coordinator refresh complete")
-
-        # Fire event
-        hass.bus.async_fire(f"{DOMAIN}_component_equipped", {
-            "bike_id": bike_id,
-            "component_ids": new_component_ids,
-            "status": "updated",
-        })
-
-    hass.services.async_register(
-        DOMAIN, EQUIP_SERVICE, async_equip_component_service, schema=EQUIP_SCHEMA
+    ledger = InstallLedger(hass, entry.entry_id)
+    await ledger.async_load()
+
+    journal = None
+    if entry.options.get(CONF_QUEUED_COMMANDS, False):
+        journal = CommandJournal(hass, entry.entry_id, client)
+        await journal.async_load()
+
+    max_cache_age = entry.options.get(CONF_MAX_CACHE_AGE, DEFAULT_MAX_CACHE_AGE)
+    push = entry.options.get(CONF_WEBHOOK, False) and CONF_WEBHOOK_ID in entry.options
+    coordinator = IntervalsICUGearCoordinator(
+        hass,
+        client,
+        entry.entry_id,
+        stagger=_stagger_for(hass, entry),
+        max_cache_age=timedelta(hours=max_cache_age) if max_cache_age else None,
+        usage=usage,
+        forecaster=forecaster,
+        stats=stats,
+        compact_attributes=entry.options.get(CONF_COMPACT_ATTRIBUTES, False),
+        include_inactive=entry.options.get(CONF_INCLUDE_INACTIVE, False),
+        push=push,
+        thresholds=thresholds,
+        journal=journal,
+        athlete_ids=athlete_ids if coach_mode else None,
+        ledger=ledger,
     )
+    if coach_mode:
+        async_register_athlete_devices(hass, entry, athlete_ids)
+    if await coordinator.async_load_cache():
+        # Build entities from the cached snapshot right away and fetch
+        # fresh data in the background
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} initial refresh"
+        )
+    else:
+        await coordinator.async_config_entry_first_refresh()
+
+    hass.data[DOMAIN][entry.entry_id] = {
+        "client": client,
+        "coordinator": coordinator,
+        "stats": stats,
+        "journal": journal,
+        # Serializes and merges component changes per bike for the services
+        "writes": BikeWriteCoalescer(hass, coordinator, client, journal),
+    }
+
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # After the platforms, so entities have registered their devices first
+    async_track_gear_devices(hass, entry, coordinator)
+    if entry.options.get(CONF_STATISTICS, True) and "recorder" in hass.config.components:
+        # Imported here so the recorder stays an optional dependency
+        from .statistics import async_setup_statistics
+
+        async_setup_statistics(hass, entry, coordinator, usage)
+    if push:
+        # Rides are pushed by Intervals.icu; polling becomes a slow safety net
+        async_setup_webhook(
+            hass,
+            entry,
+            coordinator,
+            entry.options[CONF_WEBHOOK_ID],
+            entry.options.get(CONF_WEBHOOK_SECRET),
+        )
+    if journal is not None:
+        # Replays queued changes in the background; cancelled on unload
+        entry.async_create_background_task(
+            hass, journal.async_run(coordinator), f"{DOMAIN} command journal"
+        )
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
     return True
 
+def _stagger_for(hass: HomeAssistant, entry: ConfigEntry) -> timedelta:
+    """Spread the polling phase of each entry across the update interval."""
+    entry_ids = [e.entry_id for e in hass.config_entries.async_entries(DOMAIN)]
+    position = entry_ids.index(entry.entry_id) if entry.entry_id in entry_ids else 0
+    stagger = timedelta(minutes=STAGGER_MINUTES * position)
+    return stagger % DEFAULT_INTERVAL
+
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    # Options such as timeouts are applied when the client is built
+    await hass.config_entries.async_reload(entry.entry_id)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    hass.data.pop(DOMAIN, None)
-    return await hass.config_entries.async_unload_platforms(entry, ["sensor"])
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        hass.data[DOMAIN].pop(entry.entry_id, None)
+    return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await snapshot_store(hass, entry.entry_id).async_remove()
+    await usage_store(hass, entry.entry_id).async_remove()
+    await wear_store(hass, entry.entry_id).async_remove()
+    await journal_store(hass, entry.entry_id).async_remove()
+    await ledger_store(hass, entry.entry_id).async_remove()
@@ -1,34 +1,359 @@
+import asyncio
+import codecs
+import contextlib
+import json
+import time
+from email.utils import parsedate_to_datetime
 import aiohttp
-from aiohttp import BasicAuth
+from aiohttp import BasicAuth, ClientTimeout
+from .const import DEFAULT_MAX_CONNECTIONS, DEFAULT_REQUEST_TIMEOUT
 import logging
 
 _LOGGER = logging.getLogger(__name__)
 
+API_URL = "https://intervals.icu/api/v1"
+
+# Sustained requests per second and burst size allowed per API key
+RATE_LIMIT_PER_SECOND = 1.0
+RATE_LIMIT_BURST = 10
+# Statuses after which the server asks us to come back later
+RETRY_STATUSES = (429, 503)
+MAX_RETRIES = 3
+# Longer Retry-After values fail the request instead of stalling callers
+MAX_RETRY_AFTER = 120
+
+
+class RequestBudget:
+    """Request budget shared by every configured account.
+
+    Limits how many requests run at once across all clients and spaces out
+    their start times, so several accounts polling together do not hit the
+    API in a burst.
+    """
+
+    def __init__(self, max_concurrent: int = 2, min_spacing: float = 1.0):
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._lock = asyncio.Lock()
+        self._min_spacing = min_spacing
+        self._next_start = 0.0
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        try:
+            async with self._lock:
+                loop = asyncio.get_running_loop()
+                delay = self._next_start - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self._next_start = loop.time() + self._min_spacing
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._semaphore.release()
+
+
+class TokenBucket:
+    """Request rate limiter for one API key.
+
+    Shared by every client using the key, so polls, service calls and
+    several entries on the same account stay within one allowance. A
+    ``Retry-After`` from the server pauses the whole bucket.
+    """
+
+    def __init__(self, rate: float = RATE_LIMIT_PER_SECOND, burst: int = RATE_LIMIT_BURST):
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated = None
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        """Hold back all requests for ``seconds``."""
+        loop = asyncio.get_running_loop()
+        self._paused_until = max(self._paused_until, loop.time() + seconds)
+
+    async def acquire(self):
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            while True:
+                now = loop.time()
+                if self._updated is not None:
+                    self._tokens = min(
+                        self._burst, self._tokens + (now - self._updated) * self._rate
+                    )
+                self._updated = now
+                delay = self._paused_until - now
+                if delay <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    delay = (1 - self._tokens) / self._rate
+                await asyncio.sleep(delay)
+
+
+def _retry_after(resp, attempt):
+    """Return the seconds to wait before retrying ``resp``, or None to give up."""
+    if resp.status not in RETRY_STATUSES or attempt >= MAX_RETRIES:
+        return None
+    header = resp.headers.get("Retry-After")
+    if header is None:
+        delay = 2 ** attempt
+    elif header.strip().isdigit():
+        delay = int(header)
+    else:
+        try:
+            delay = parsedate_to_datetime(header).timestamp() - time.time()
+        except (TypeError, ValueError):
+            delay = 2 ** attempt
+    delay = max(delay, 0)
+    return delay if delay <= MAX_RETRY_AFTER else None
+
+
+def split_athlete_ids(value):
+    """Split the configured athlete ID field ("i1, i2") into a list of IDs."""
+    return [part.strip() for part in str(value).split(",") if part.strip()]
+
+
+async def _iter_json_array(resp, chunk_size=65536):
+    """Yield the items of a top-level JSON array as it streams in.
+
+    Only one item plus one network chunk is held in memory, so long
+    activity histories are parsed without buffering the whole body.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    started = False
+    eof = False
+
+    while True:
+        # Skip whitespace and separators between items
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if not started and pos < len(buf):
+            if buf[pos] != "[":
+                raise ValueError("Expected a JSON array")
+            started = True
+            pos += 1
+            continue
+        if started and pos < len(buf) and buf[pos] == "]":
+            return
+        if pos < len(buf):
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # Require a delimiter after the item so a value cut off at a
+                # chunk boundary is never mistaken for a complete one
+                if end < len(buf) or eof:
+                    yield item
+                    pos = end
+                    continue
+        if eof:
+            if not started:
+                return
+            raise ValueError("Truncated JSON array")
+        chunk = await resp.content.read(chunk_size)
+        eof = not chunk
+        buf = buf[pos:] + utf8.decode(chunk, final=eof)
+        pos = 0
+
+
 class IntervalsICUClient:
-    def __init__(self, api_key: str, athlete_id: str):
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        api_key: str,
+        athlete_id: str,
+        timeout: float = DEFAULT_REQUEST_TIMEOUT,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        budget: RequestBudget | None = None,
+        rate_limit: TokenBucket | None = None,
+        api_url: str = API_URL,
+        stats=None,
+    ):
+        # The session is owned by the caller (normally Home Assistant's shared
+        # client session) so connections are pooled and kept alive across calls.
+        self.session = session
         self.api_key = api_key
         self.athlete_id = athlete_id
-        self.base_url = f"https://intervals.icu/api/v1/athlete/{athlete_id}"
+        self.api_url = api_url
+        self.base_url = f"{api_url}/athlete/{athlete_id}"
         self.auth = BasicAuth("API_KEY", api_key)
+        self.timeout = ClientTimeout(total=timeout, connect=min(timeout, 10))
+        # Caps the number of simultaneous requests this client keeps open
+        self._limit = asyncio.Semaphore(max_connections)
+        self._budget = budget
+        self._rate_limit = rate_limit or TokenBucket()
+        # Identical reads in flight, shared by concurrent callers:
+        # key -> [future, number of callers waiting on it]
+        self._inflight = {}
+        # Optional PerfStats collecting latency, sizes and error counters
+        self.stats = stats
+
+    @contextlib.asynccontextmanager
+    async def _slot(self):
+        """Take a rate-limit token, then hold a connection and budget slot."""
+        # Wait for the token first so a paused key does not hold slots
+        await self._rate_limit.acquire()
+        async with self._limit:
+            if self._budget is None:
+                yield
+                return
+            async with self._budget:
+                yield
+
+    def _record_error(self, kind):
+        if self.stats is not None:
+            self.stats.record_error(kind)
+
+    def _should_retry(self, resp, attempt):
+        """Back off after a 429/503 response; return whether to try again."""
+        delay = _retry_after(resp, attempt)
+        if delay is None:
+            return False
+        _LOGGER.warning(
+            "Intervals.icu returned HTTP %s, retrying in %.0f seconds", resp.status, delay
+        )
+        self._rate_limit.pause(delay)
+        if self.stats is not None:
+            self.stats.record_retry()
+        return True
+
+    async def _async_request_json(self, method, endpoint, url, **kwargs):
+        """Send a request and decode its JSON body, recording timings."""
+        for attempt in range(MAX_RETRIES + 1):
+            async with self._slot():
+                start = time.monotonic()
+                try:
+                    async with self.session.request(
+                        method, url, auth=self.auth, timeout=self.timeout, **kwargs
+                    ) as resp:
+                        _LOGGER.debug("API response status: %s", resp.status)
+                        if self._should_retry(resp, attempt):
+                            continue
+                        if resp.status == 401:
+                            _LOGGER.error("Authentication failed - check your API key and athlete ID")
+                        resp.raise_for_status()
+                        body = await resp.read()
+                except aiohttp.ClientResponseError as err:
+                    self._record_error(f"http_{err.status}")
+                    raise
+                except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                    self._record_error(type(err).__name__)
+                    raise
+            received = time.monotonic()
+            data = json.loads(body) if body else None
+            if self.stats is not None:
+                self.stats.record_request(
+                    endpoint, received - start, len(body), time.monotonic() - received
+                )
+            return data
 
-    async def async_get_gear(self):
-        url = f"{self.base_url}/gear"
+    async def _async_coalesced(self, key, request):
+        """Run ``request()`` once for all concurrent callers asking for ``key``."""
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            future = asyncio.ensure_future(request())
+            inflight = self._inflight[key] = [future, 0]
+
+            def _done(fut):
+                if self._inflight.get(key) is inflight:
+                    del self._inflight[key]
+                # Mark the result retrieved even if every caller was cancelled
+                if not fut.cancelled():
+                    fut.exception()
+
+            future.add_done_callback(_done)
+        else:
+            future = inflight[0]
+            _LOGGER.debug("Joining in-flight request for %s", key)
+        inflight[1] += 1
+        try:
+            # A cancelled caller must not cancel the request for the others
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # ... but nobody is left to wait out its retries after the last one
+            if inflight[1] == 1:
+                future.cancel()
+            raise
+        finally:
+            inflight[1] -= 1
+
+    def cancel_requests(self):
+        """Cancel the shared requests still in flight, e.g. when the entry unloads."""
+        for future, _ in list(self._inflight.values()):
+            future.cancel()
+
+    def _athlete_url(self, athlete_id=None):
+        if athlete_id is None:
+            return self.base_url
+        return f"{self.api_url}/athlete/{athlete_id}"
+
+    async def async_get_gear(self, athlete_id: str | None = None):
+        url = f"{self._athlete_url(athlete_id)}/gear"
         _LOGGER.debug("Fetching gear from: %s", url)
-        async with aiohttp.ClientSession(auth=self.auth) as session:
-            async with session.get(url) as resp:
-                _LOGGER.debug("API response status: %s", resp.status)
-                if resp.status == 401:
-                    _LOGGER.error("Authentication failed - check your API key and athlete ID")
-                resp.raise_for_status()
-                data = await resp.json()
-                _LOGGER.debug("API returned %d gear items", len(data) if data else 0)
-                return data
-
-    async def async_update_bike_components(self, bike_id: str, component_ids: list):
-        url = f"{self.base_url}/gear/{bike_id}"
-        headers = {"Content-Type": "application/json"}
+        data = await self._async_coalesced(
+            url, lambda: self._async_request_json("GET", "GET /gear", url)
+        )
+        _LOGGER.debug("API returned %d gear items", len(data) if data else 0)
+        return data
+
+    async def async_get_fleet(self, athlete_ids):
+        """Fetch the gear of several athletes concurrently.
+
+        Returns {athlete_id: gear list or exception}, so one athlete's
+        failure does not hide the others. Concurrency is bounded by the
+        client's connection limit and the shared request budget.
+        """
+        results = await asyncio.gather(
+            *(self.async_get_gear(athlete_id) for athlete_id in athlete_ids),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result
+        return dict(zip(athlete_ids, results))
+
+    async def async_iter_activities(self, oldest: str, newest: str | None = None):
+        """Stream activities started on or after the ``oldest`` date."""
+        url = f"{self.base_url}/activities"
+        params = {"oldest": oldest}
+        if newest:
+            params["newest"] = newest
+        _LOGGER.debug("Fetching activities since %s", oldest)
+        for attempt in range(MAX_RETRIES + 1):
+            async with self._slot():
+                start = time.monotonic()
+                try:
+                    async with self.session.get(
+                        url, auth=self.auth, params=params, timeout=self.timeout
+                    ) as resp:
+                        if self._should_retry(resp, attempt):
+                            continue
+                        resp.raise_for_status()
+                        async for activity in _iter_json_array(resp):
+                            yield activity
+                except aiohttp.ClientResponseError as err:
+                    self._record_error(f"http_{err.status}")
+                    raise
+                except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                    self._record_error(type(err).__name__)
+                    raise
+                if self.stats is not None:
+                    self.stats.record_request("GET /activities", time.monotonic() - start)
+            return
+
+    async def async_update_bike_components(
+        self, bike_id: str, component_ids: list, athlete_id: str | None = None
+    ):
+        url = f"{self._athlete_url(athlete_id)}/gear/{bike_id}"
         payload = {"component_ids": component_ids}
-        async with aiohttp.ClientSession(auth=self.auth) as session:
-            async with session.put(url, headers=headers, json=payload) as resp:
-                resp.raise_for_status()
-                return await resp.json()
+        return await self._async_request_json("PUT", "PUT /gear/{id}", url, json=payload)
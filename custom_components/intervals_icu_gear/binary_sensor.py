@@ -0,0 +1,76 @@
+from homeassistant.components.binary_sensor import BinarySensorDeviceClass, BinarySensorEntity
+from .const import DOMAIN
+from .entity import IntervalsICUGearEntity, async_track_gear_entities, tracked_gear
+from .sensor import UNRECORDED_COMPONENT_ATTRIBUTES
+from functools import partial
+
+
+def _entity_factories(coordinator):
+    """Yield (unique_id, factory) for a wear sensor on every component with a limit."""
+    thresholds = coordinator.thresholds
+    if thresholds is None:
+        return
+    for comp in tracked_gear(coordinator):
+        if comp.get("component", False) and thresholds.applies_to(comp):
+            yield (
+                IntervalsICUComponentWornSensor.unique_id_for(comp),
+                partial(IntervalsICUComponentWornSensor, coordinator, comp),
+            )
+
+
+async def async_setup_entry(hass, entry, async_add_entities):
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    async_track_gear_entities(
+        hass, entry, coordinator, async_add_entities, _entity_factories, "binary_sensor"
+    )
+
+
+class IntervalsICUComponentWornSensor(IntervalsICUGearEntity, BinarySensorEntity):
+    """On when a component has reached its distance or time limit."""
+
+    _attr_device_class = BinarySensorDeviceClass.PROBLEM
+    _attr_has_entity_name = True
+    _attr_name = "Worn"
+    _attr_icon = "mdi:wrench-clock"
+    _unrecorded_attributes = UNRECORDED_COMPONENT_ATTRIBUTES | {
+        "distance_limit_km",
+        "time_limit_hours",
+    }
+
+    @staticmethod
+    def unique_id_for(comp):
+        return f"intervals_icu_component_{comp['id']}_worn"
+
+    def __init__(self, coordinator, comp):
+        super().__init__(coordinator)
+        self._comp_id = comp["id"]
+        self._comp_type = comp.get("type", "Component")
+        self._comp_name = comp.get("name", "Unknown")
+        self._attr_unique_id = self.unique_id_for(comp)
+
+    @property
+    def _threshold(self):
+        return self.coordinator.thresholds.get(self._comp_id)
+
+    def _watched_ids(self):
+        return [self._comp_id]
+
+    @property
+    def device_info(self):
+        return self._gear_device_info(self._comp_id, self._comp_name, self._comp_type)
+
+    def _compute_attributes(self):
+        threshold = self._threshold
+        if threshold is None:
+            return {}
+        return {
+            "distance_km": threshold.distance_km,
+            "distance_limit_km": threshold.distance_limit_km,
+            "time_hours": threshold.hours,
+            "time_limit_hours": threshold.time_limit_hours,
+        }
+
+    @property
+    def is_on(self):
+        threshold = self._threshold
+        return threshold.exceeded if threshold is not None else None
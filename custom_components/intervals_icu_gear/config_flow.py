@@ -1,12 +1,41 @@
 import voluptuous as vol
 from homeassistant import config_entries
-from .const import DOMAIN, CONF_API_KEY, CONF_ATHLETE_ID
+from homeassistant.components import webhook
+from homeassistant.core import callback
+from .const import (
+    DOMAIN,
+    CONF_ACTIVITY_SYNC,
+    CONF_API_KEY,
+    CONF_ATHLETE_ID,
+    CONF_COMPACT_ATTRIBUTES,
+    CONF_INCLUDE_INACTIVE,
+    CONF_MAX_CACHE_AGE,
+    CONF_MAX_CONNECTIONS,
+    CONF_QUEUED_COMMANDS,
+    CONF_REQUEST_TIMEOUT,
+    CONF_STATISTICS,
+    CONF_TIME_LIMITS,
+    CONF_WEAR_LIMITS,
+    CONF_WEBHOOK,
+    CONF_WEBHOOK_ID,
+    CONF_WEBHOOK_SECRET,
+    DEFAULT_MAX_CACHE_AGE,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_REQUEST_TIMEOUT,
+    DEFAULT_WEAR_LIMITS,
+)
+from .forecast import format_limits, parse_limits
 
 class IntervalsICUGearConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Intervals.icu Gear."""
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        return IntervalsICUGearOptionsFlow(config_entry)
+
     async def async_step_user(self, user_input=None):
         errors = {}
         if user_input is not None:
@@ -20,3 +49,83 @@ class IntervalsICUGearConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             }),
             errors=errors,
         )
+
+
+class IntervalsICUGearOptionsFlow(config_entries.OptionsFlow):
+    """Handle options for Intervals.icu Gear."""
+
+    def __init__(self, config_entry):
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        errors = {}
+        if user_input is not None:
+            for key in (CONF_WEAR_LIMITS, CONF_TIME_LIMITS):
+                try:
+                    parse_limits(user_input.get(key))
+                except ValueError:
+                    errors[key] = "invalid_limits"
+            if not errors:
+                # Keep the webhook URL stable across option changes
+                webhook_id = self._entry.options.get(CONF_WEBHOOK_ID)
+                if user_input.get(CONF_WEBHOOK) and webhook_id is None:
+                    webhook_id = webhook.async_generate_id()
+                if webhook_id is not None:
+                    user_input = {**user_input, CONF_WEBHOOK_ID: webhook_id}
+                return self.async_create_entry(title="", data=user_input)
+
+        options = {**self._entry.options, **(user_input or {})}
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema({
+                vol.Optional(
+                    CONF_REQUEST_TIMEOUT,
+                    default=options.get(CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT),
+                ): vol.All(vol.Coerce(int), vol.Range(min=5, max=300)),
+                vol.Optional(
+                    CONF_MAX_CONNECTIONS,
+                    default=options.get(CONF_MAX_CONNECTIONS, DEFAULT_MAX_CONNECTIONS),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=20)),
+                vol.Optional(
+                    CONF_MAX_CACHE_AGE,
+                    default=options.get(CONF_MAX_CACHE_AGE, DEFAULT_MAX_CACHE_AGE),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=8760)),
+                vol.Optional(
+                    CONF_ACTIVITY_SYNC,
+                    default=options.get(CONF_ACTIVITY_SYNC, False),
+                ): bool,
+                vol.Optional(
+                    CONF_WEAR_LIMITS,
+                    default=options.get(CONF_WEAR_LIMITS, format_limits(DEFAULT_WEAR_LIMITS)),
+                ): str,
+                vol.Optional(
+                    CONF_TIME_LIMITS,
+                    default=options.get(CONF_TIME_LIMITS, ""),
+                ): str,
+                vol.Optional(
+                    CONF_STATISTICS,
+                    default=options.get(CONF_STATISTICS, True),
+                ): bool,
+                vol.Optional(
+                    CONF_QUEUED_COMMANDS,
+                    default=options.get(CONF_QUEUED_COMMANDS, False),
+                ): bool,
+                vol.Optional(
+                    CONF_COMPACT_ATTRIBUTES,
+                    default=options.get(CONF_COMPACT_ATTRIBUTES, False),
+                ): bool,
+                vol.Optional(
+                    CONF_INCLUDE_INACTIVE,
+                    default=options.get(CONF_INCLUDE_INACTIVE, False),
+                ): bool,
+                vol.Optional(
+                    CONF_WEBHOOK,
+                    default=options.get(CONF_WEBHOOK, False),
+                ): bool,
+                vol.Optional(
+                    CONF_WEBHOOK_SECRET,
+                    default=options.get(CONF_WEBHOOK_SECRET, ""),
+                ): str,
+            }),
+            errors=errors,
+        )
@@ -1,3 +1,31 @@
 DOMAIN = "intervals_icu_gear"
 CONF_API_KEY = "api_key"
 CONF_ATHLETE_ID = "athlete_id"
+
+# Options
+CONF_REQUEST_TIMEOUT = "request_timeout"
+CONF_MAX_CONNECTIONS = "max_connections"
+CONF_MAX_CACHE_AGE = "max_cache_age"
+CONF_ACTIVITY_SYNC = "activity_sync"
+CONF_WEAR_LIMITS = "wear_limits"
+CONF_TIME_LIMITS = "time_limits"
+CONF_COMPACT_ATTRIBUTES = "compact_attributes"
+CONF_INCLUDE_INACTIVE = "include_inactive"
+CONF_STATISTICS = "statistics"
+CONF_QUEUED_COMMANDS = "queued_commands"
+CONF_WEBHOOK = "webhook"
+CONF_WEBHOOK_ID = "webhook_id"
+CONF_WEBHOOK_SECRET = "webhook_secret"
+
+DEFAULT_REQUEST_TIMEOUT = 30
+DEFAULT_MAX_CONNECTIONS = 4
+# Hours a cached gear snapshot may be used at startup; 0 disables the cache
+DEFAULT_MAX_CACHE_AGE = 168
+# Distance limits (km) per component type used for wear forecasts
+DEFAULT_WEAR_LIMITS = {"Chain": 3000, "Cassette": 10000}
+
+# Polls of different entries are offset by this many minutes
+STAGGER_MINUTES = 5
+DATA_REQUEST_BUDGET = f"{DOMAIN}_request_budget"
+# Rate limiters keyed by API key, shared by entries using the same key
+DATA_RATE_LIMITS = f"{DOMAIN}_rate_limits"
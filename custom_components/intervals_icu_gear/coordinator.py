@@ -0,0 +1,293 @@
+from datetime import timedelta
+import time
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
+from .const import DOMAIN
+from .models import GearIndex, parse_gear
+from .scheduler import PollScheduler
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+# Slack on top of the poll interval before services stop trusting the
+# snapshot and refetch; exceeding it means a scheduled poll was missed
+SNAPSHOT_GRACE = timedelta(minutes=10)
+
+STORAGE_VERSION = 1
+# Seconds to wait before writing the snapshot cache, to batch rapid updates
+CACHE_SAVE_DELAY = 10
+
+
+def snapshot_store(hass, entry_id):
+    """Return the store holding an entry's last good gear payload."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.snapshot")
+
+
+class IntervalsICUGearCoordinator(DataUpdateCoordinator):
+    """Polls Intervals.icu and publishes an indexed gear snapshot."""
+
+    def __init__(
+        self,
+        hass,
+        client,
+        entry_id,
+        stagger=timedelta(0),
+        max_cache_age=None,
+        usage=None,
+        forecaster=None,
+        stats=None,
+        compact_attributes=False,
+        include_inactive=False,
+        push=False,
+        thresholds=None,
+        journal=None,
+        athlete_ids=None,
+        ledger=None,
+    ):
+        self.scheduler = PollScheduler(stagger, push=push)
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=self.scheduler.interval,
+            # Listeners are skipped when the new snapshot equals the old one
+            always_update=False,
+        )
+        self.client = client
+        # Gear IDs that changed in the last update; None means "everything"
+        self.changed_ids = None
+        # When the snapshot was last confirmed against the server
+        self.data_updated_at = None
+        # When the interval to the next scheduled poll started counting
+        self._poll_scheduled_at = None
+        # Last good snapshot on disk, used for instant, offline-tolerant startup
+        self.max_cache_age = max_cache_age
+        self._store = snapshot_store(hass, entry_id) if max_cache_age else None
+        self._cache_saved_at = None
+        # Optional activity-level usage store, synced when rides are detected
+        self.usage = usage
+        self._usage_synced = False
+        # Optional wear forecaster, evaluated in one pass per refresh
+        self.forecaster = forecaster
+        # Optional PerfStats shared with the client and the entities
+        self.stats = stats
+        # Optional distance/time limits behind the wear binary sensors
+        self.thresholds = thresholds
+        # Optional journal of queued changes, laid over every fetched snapshot
+        self.journal = journal
+        # Optional ledger of component installs, updated from every snapshot
+        self.ledger = ledger
+        # Whether entities leave out attributes that duplicate other sensors
+        self.compact_attributes = compact_attributes
+        # Whether retired and never-used gear gets entities too
+        self.include_inactive = include_inactive
+        # Coach mode: every athlete whose gear is fetched, else None
+        self.athlete_ids = athlete_ids
+        # athlete_id -> error of the last fetch, for athletes that failed
+        self.athlete_errors = {}
+
+    async def async_load_cache(self):
+        """Seed the snapshot from disk; return True if a usable cache was found."""
+        if self._store is None:
+            return False
+        cached = await self._store.async_load()
+        if not cached:
+            return False
+        saved_at = dt_util.parse_datetime(cached.get("saved_at") or "")
+        if saved_at is None or dt_util.utcnow() - saved_at > self.max_cache_age:
+            _LOGGER.debug("Cached Intervals.icu gear snapshot is too old, ignoring it")
+            return False
+        self.data = GearIndex(cached.get("gear"))
+        if self.thresholds is not None:
+            self.thresholds.update(self.data)
+        if self.ledger is not None:
+            self.ledger.update(self.data, source="cache")
+        self.data_updated_at = saved_at
+        self._poll_scheduled_at = saved_at
+        self._cache_saved_at = saved_at
+        _LOGGER.debug("Loaded %d gear items from cache saved at %s", len(self.data), saved_at)
+        return True
+
+    @callback
+    def _async_save_cache(self, index):
+        if self._store is None:
+            return
+        saved_at = self.data_updated_at
+        self._cache_saved_at = saved_at
+        self._store.async_delay_save(
+            lambda: {"saved_at": saved_at.isoformat(), "gear": [g.as_dict() for g in index.gear]},
+            CACHE_SAVE_DELAY,
+        )
+
+    @property
+    def data_available(self):
+        """Whether entities should show the snapshot despite a failed poll."""
+        if self.last_update_success:
+            return True
+        return (
+            self.max_cache_age is not None
+            and self.data is not None
+            and self.data_updated_at is not None
+            and dt_util.utcnow() - self.data_updated_at <= self.max_cache_age
+        )
+
+    async def _async_refresh(self, *args, **kwargs):
+        if self.stats is None:
+            return await super()._async_refresh(*args, **kwargs)
+        self.stats.begin_refresh()
+        start = time.monotonic()
+        try:
+            await super()._async_refresh(*args, **kwargs)
+        finally:
+            # Listener updates for derived data run via call_soon; record the
+            # refresh after them so their entity writes are counted
+            self.hass.loop.call_soon(
+                self.stats.finish_refresh,
+                time.monotonic() - start,
+                self.last_update_success,
+            )
+
+    async def _async_update_data(self):
+        self.changed_ids = frozenset()
+        try:
+            if self.athlete_ids is None:
+                data = await self.client.async_get_gear()
+                _LOGGER.debug("Intervals.icu API returned %d items", len(data) if data else 0)
+                start = time.monotonic()
+                records = parse_gear(data)
+            else:
+                fleet = await self.client.async_get_fleet(self.athlete_ids)
+                start = time.monotonic()
+                records = self._merge_fleet(fleet)
+        except Exception as err:
+            _LOGGER.error("Error fetching Intervals.icu gear data: %s", err)
+            self.update_interval = self.scheduler.on_error()
+            raise
+
+        self.data_updated_at = self._poll_scheduled_at = dt_util.utcnow()
+        parsed = time.monotonic()
+        index = GearIndex(records)
+        if self.journal is not None:
+            index = self.journal.overlay(index)
+        if self.stats is not None:
+            self.stats.record_parse(parsed - start)
+            self.stats.record_index(time.monotonic() - parsed)
+        distance_changed = self._distance_changed(index)
+        # Usage and forecasts are derived data that can change on their own
+        derived_changed = await self._async_sync_usage(index, distance_changed)
+        partial = bool(self.athlete_errors)
+        if self.forecaster is not None:
+            derived_changed |= self.forecaster.update(index, partial=partial)
+        if self.thresholds is not None:
+            derived_changed |= self.thresholds.update(index)
+        if self.ledger is not None:
+            derived_changed |= self.ledger.update(index, partial=partial)
+
+        if index == self.data:
+            _LOGGER.debug("Intervals.icu gear unchanged, skipping entity updates")
+            self.update_interval = self.scheduler.on_success()
+            if derived_changed:
+                # The snapshot compares equal, so notify the affected entities
+                # ourselves once this refresh has finished
+                self.changed_ids = frozenset(derived_changed)
+                self.hass.loop.call_soon(self.async_update_listeners)
+            # Refresh the cache timestamp now and then so it does not expire
+            if (
+                self._cache_saved_at is None
+                or self.data_updated_at - self._cache_saved_at > self.max_cache_age / 2
+            ):
+                self._async_save_cache(self.data)
+            return self.data
+        self.changed_ids = index.changed_since(self.data) | derived_changed
+        _LOGGER.debug("Intervals.icu gear changed: %d items", len(self.changed_ids))
+        self.update_interval = self.scheduler.on_success(
+            distance_changed=distance_changed, changed=True
+        )
+        self._async_save_cache(index)
+        return index
+
+    def _merge_fleet(self, fleet):
+        """Parse every athlete's gear list into one list of records.
+
+        An athlete whose fetch failed keeps their gear from the previous
+        snapshot, if there is one, and is listed in ``athlete_errors``. Gear
+        missing because of a failure is not removed: entities, devices, the
+        install ledger and wear samples leave those athletes alone. Only a
+        refresh where every athlete failed fails.
+        """
+        records = []
+        errors = {}
+        for athlete_id, result in fleet.items():
+            if isinstance(result, Exception):
+                errors[athlete_id] = result
+                records.extend(g for g in self.data or () if g.athlete == athlete_id)
+                continue
+            _LOGGER.debug(
+                "Intervals.icu API returned %d items for athlete %s",
+                len(result) if result else 0,
+                athlete_id,
+            )
+            records.extend(parse_gear(result, athlete_id))
+        self.athlete_errors = {athlete_id: str(err) for athlete_id, err in errors.items()}
+        if len(errors) == len(fleet):
+            raise next(iter(errors.values()))
+        for athlete_id, err in errors.items():
+            _LOGGER.warning("Error fetching gear of athlete %s, keeping last known: %s", athlete_id, err)
+        return records
+
+    def _distance_changed(self, index):
+        """Whether any gear gained distance, i.e. a ride was recorded."""
+        if self.data is None:
+            return False
+        old = self.data
+        return any(
+            gid in old.by_id and old.by_id[gid].distance != g.distance
+            for gid, g in index.by_id.items()
+        )
+
+    async def _async_sync_usage(self, index, distance_changed):
+        """Sync activities when a ride was detected; return gear IDs whose usage changed."""
+        if self.usage is None:
+            return frozenset()
+        changed = self.usage.update_window()
+        if distance_changed or not self._usage_synced or self.usage.cursor is None:
+            try:
+                changed |= await self.usage.async_sync(self.client, index)
+                self._usage_synced = True
+            except Exception as err:
+                # Usage is an extra; never fail the gear refresh because of it
+                _LOGGER.warning("Error syncing Intervals.icu activities: %s", err)
+        return frozenset(changed)
+
+    @callback
+    def async_set_updated_data(self, data):
+        self.changed_ids = data.changed_since(self.data)
+        if self.thresholds is not None:
+            self.changed_ids |= self.thresholds.update(data)
+        if self.ledger is not None:
+            self.changed_ids |= self.ledger.update(
+                data, source="patch", partial=bool(self.athlete_errors)
+            )
+        # Setting data also reschedules the next poll from now
+        self.data_updated_at = self._poll_scheduled_at = dt_util.utcnow()
+        # Local updates come from equip calls; watch closely for follow-ups
+        self.scheduler.note_activity("local_update")
+        self.update_interval = self.scheduler.on_success(changed=True)
+        self._async_save_cache(data)
+        super().async_set_updated_data(data)
+
+    @property
+    def snapshot_is_stale(self):
+        """Whether the current snapshot is too old to act on.
+
+        It is stale once the next scheduled poll is overdue, using the
+        interval the scheduler picked when that poll was scheduled.
+        """
+        return (
+            self.data is None
+            or not self.last_update_success
+            or self._poll_scheduled_at is None
+            or dt_util.utcnow() - self._poll_scheduled_at > self.update_interval + SNAPSHOT_GRACE
+        )
@@ -0,0 +1,32 @@
+"""Diagnostics support for Intervals.icu Gear."""
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from .const import CONF_API_KEY, CONF_WEBHOOK_ID, CONF_WEBHOOK_SECRET, DOMAIN
+
+TO_REDACT = {CONF_API_KEY, CONF_WEBHOOK_ID, CONF_WEBHOOK_SECRET}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    coordinator = entry_data["coordinator"]
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "data_updated_at": (
+                coordinator.data_updated_at.isoformat() if coordinator.data_updated_at else None
+            ),
+            "gear_count": len(coordinator.data) if coordinator.data is not None else 0,
+            "update_interval_seconds": round(coordinator.update_interval.total_seconds()),
+            "scheduler": coordinator.scheduler.as_dict(),
+            "athlete_ids": coordinator.athlete_ids,
+            "athlete_errors": coordinator.athlete_errors,
+        },
+        "performance": entry_data["stats"].as_dict(),
+        "recent_installs": coordinator.ledger.events[-20:] if coordinator.ledger else [],
+        "queued_changes": (
+            len(entry_data["journal"].pending) if entry_data["journal"] is not None else None
+        ),
+    }
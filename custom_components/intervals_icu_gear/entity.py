@@ -0,0 +1,261 @@
+from homeassistant.core import callback
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from .const import DOMAIN
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+# Device identifiers of the per-athlete parent devices in coach mode
+ATHLETE_DEVICE_PREFIX = "athlete_"
+
+
+def athlete_device_id(athlete_id):
+    """Return the device identifier grouping one athlete's gear in coach mode."""
+    return f"{ATHLETE_DEVICE_PREFIX}{athlete_id}"
+
+
+@callback
+def async_register_athlete_devices(hass, entry, athlete_ids):
+    """Create the parent devices that gear devices hang off in coach mode."""
+    dev_reg = dr.async_get(hass)
+    for athlete_id in athlete_ids:
+        dev_reg.async_get_or_create(
+            config_entry_id=entry.entry_id,
+            identifiers={(DOMAIN, athlete_device_id(athlete_id))},
+            name=f"Intervals.icu athlete {athlete_id}",
+            manufacturer="Intervals.icu",
+            model="Athlete",
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+
+@callback
+def async_unavailable_athlete_devices(hass, coordinator):
+    """Return the device IDs of athletes whose gear the last poll could not fetch.
+
+    Their gear may be missing from the snapshot, so devices and entities
+    under them are left alone until they are fetched again.
+    """
+    dev_reg = dr.async_get(hass)
+    device_ids = set()
+    for athlete_id in coordinator.athlete_errors:
+        device = dev_reg.async_get_device(identifiers={(DOMAIN, athlete_device_id(athlete_id))})
+        if device is not None:
+            device_ids.add(device.id)
+    return device_ids
+
+
+def gear_device_info(index, gear_id, name=None, model=None):
+    """Return the device of a gear item, under its athlete in coach mode.
+
+    ``name`` and ``model`` are used when the snapshot no longer has the item.
+    """
+    gear = index.get(gear_id)
+    info = {
+        "identifiers": {(DOMAIN, gear_id)},
+        "name": gear.get("name", name),
+        "manufacturer": "Intervals.icu",
+        "model": gear.get("type", model),
+        "entry_type": DeviceEntryType.SERVICE,
+    }
+    if gear.athlete is not None:
+        info["via_device"] = (DOMAIN, athlete_device_id(gear.athlete))
+    return info
+
+
+def _gear_ids_of(entry, device):
+    """Return the gear IDs among a device's identifiers."""
+    return [
+        i for d, i in device.identifiers
+        if d == DOMAIN and i != entry.entry_id and not i.startswith(ATHLETE_DEVICE_PREFIX)
+    ]
+
+
+def has_device(coordinator, gear):
+    """Whether gear gets a device; retired gear only when included.
+
+    Spares that have never been used get a device but no entities, so they
+    can still be picked in the services that fit them.
+    """
+    return coordinator.include_inactive or not gear.get("retired")
+
+
+def is_tracked(coordinator, gear):
+    """Whether gear gets entities; inactive gear only when included."""
+    return coordinator.include_inactive or not coordinator.data.is_inactive(gear)
+
+
+def tracked_gear(coordinator):
+    """Return the gear that gets entities."""
+    index = coordinator.data
+    if coordinator.include_inactive:
+        return iter(index)
+    return (gear for gear in index if not index.is_inactive(gear))
+
+
+@callback
+def async_track_gear_devices(hass, entry, coordinator):
+    """Keep the gear devices in line with the snapshot.
+
+    Entities register the devices of the gear they show; this adds devices
+    for gear without entities and detaches devices of gear that is gone or
+    should have none. Only gear that changed is looked at after the first run.
+    """
+    dev_reg = dr.async_get(hass)
+
+    @callback
+    def _async_sync_device(index, gear_id, unavailable):
+        gear = index.by_id.get(gear_id)
+        if gear is not None and has_device(coordinator, gear):
+            if not is_tracked(coordinator, gear):
+                dev_reg.async_get_or_create(
+                    config_entry_id=entry.entry_id, **gear_device_info(index, gear_id)
+                )
+            return
+        device = dev_reg.async_get_device(identifiers={(DOMAIN, gear_id)})
+        if device is None or device.via_device_id in unavailable:
+            return
+        if entry.entry_id in device.config_entries:
+            dev_reg.async_update_device(device.id, remove_config_entry_id=entry.entry_id)
+
+    @callback
+    def _async_sync_devices(initial=False):
+        index = coordinator.data
+        # An empty gear list is treated as a glitch rather than "everything was sold"
+        if index is None or not len(index):
+            return
+        changed = coordinator.changed_ids
+        if initial or changed is None:
+            gear_ids = set(index.by_id)
+            # Also covers devices of gear that disappeared while not running
+            for device in dr.async_entries_for_config_entry(dev_reg, entry.entry_id):
+                gear_ids.update(_gear_ids_of(entry, device))
+        else:
+            gear_ids = changed
+        unavailable = async_unavailable_athlete_devices(hass, coordinator)
+        for gear_id in gear_ids:
+            _async_sync_device(index, gear_id, unavailable)
+
+    _async_sync_devices(initial=True)
+    entry.async_on_unload(coordinator.async_add_listener(_async_sync_devices))
+
+
+@callback
+def async_track_gear_entities(
+    hass, entry, coordinator, async_add_entities, entity_factories, domain, keep=frozenset()
+):
+    """Keep a platform's entities in line with the gear snapshot.
+
+    ``entity_factories(coordinator)`` yields ``(unique_id, factory)`` for every
+    entity the current snapshot calls for. Only entities not added yet are
+    constructed after each update, and registry entries of ``domain`` that
+    are no longer needed (other than ``keep``) are removed, unless they belong
+    to an athlete whose gear could not be fetched.
+    """
+    ent_reg = er.async_get(hass)
+    dev_reg = dr.async_get(hass)
+
+    def _under(device_id, parent_ids):
+        device = dev_reg.async_get(device_id) if device_id else None
+        return device is not None and device.via_device_id in parent_ids
+
+    # unique_id -> entity for everything this platform currently provides
+    known = {}
+
+    @callback
+    def _async_sync_entities():
+        """Add entities the snapshot now needs and retire the ones it no longer does."""
+        required = dict(entity_factories(coordinator))
+
+        new_entities = [factory() for uid, factory in required.items() if uid not in known]
+        known.update((entity.unique_id, entity) for entity in new_entities)
+
+        # Also covers registry entries left behind by a previous run. An empty
+        # gear list is treated as a glitch rather than "everything was sold",
+        # and gear of an athlete that failed to load may just be missing.
+        unavailable = async_unavailable_athlete_devices(hass, coordinator)
+        stale = {
+            reg_entry.unique_id: reg_entry.entity_id
+            for reg_entry in er.async_entries_for_config_entry(ent_reg, entry.entry_id)
+            if reg_entry.domain == domain
+            and reg_entry.unique_id not in required
+            and reg_entry.unique_id not in keep
+            and not (unavailable and _under(reg_entry.device_id, unavailable))
+        } if len(coordinator.data) else {}
+        for uid, entity_id in stale.items():
+            known.pop(uid, None)
+            # Removing the registry entry also removes the entity from hass
+            ent_reg.async_remove(entity_id)
+
+        if new_entities:
+            _LOGGER.info("Adding %d Intervals.icu gear %s entities", len(new_entities), domain)
+            async_add_entities(new_entities)
+        if stale:
+            _LOGGER.info("Removed %d stale Intervals.icu gear %s entities", len(stale), domain)
+
+    _async_sync_entities()
+    entry.async_on_unload(coordinator.async_add_listener(_async_sync_entities))
+
+
+class IntervalsICUGearEntity(CoordinatorEntity):
+    """Base entity that only writes state when the gear it shows changed."""
+
+    def __init__(self, coordinator):
+        super().__init__(coordinator)
+        self._was_available = None
+        self._last_watched = frozenset()
+        # Attributes of the last written state, rebuilt only when it changes
+        self._attributes = None
+
+    @property
+    def available(self):
+        # Keep showing a recent snapshot while Intervals.icu is unreachable
+        return self.coordinator.data_available
+
+    def _watched_ids(self):
+        """Return the gear IDs this entity's state is derived from."""
+        raise NotImplementedError
+
+    def _gear_device_info(self, gear_id, name, model):
+        return gear_device_info(self.coordinator.data, gear_id, name, model)
+
+    def _compute_attributes(self):
+        """Return the state attributes for the current snapshot."""
+        return None
+
+    @property
+    def extra_state_attributes(self):
+        if self._attributes is None:
+            self._attributes = self._compute_attributes()
+        return self._attributes
+
+    @callback
+    def _remember_written_state(self):
+        """Record what the state just written was derived from."""
+        self._was_available = self.available
+        self._last_watched = frozenset(self._watched_ids())
+
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        # The initial state is written when the entity is added
+        self._remember_written_state()
+
+    @callback
+    def _handle_coordinator_update(self):
+        changed = self.coordinator.changed_ids
+        watched = frozenset(self._watched_ids())
+        # Compare against the previously watched IDs too, so an entity notices
+        # when a component it showed was removed or moved elsewhere
+        if (
+            changed is None
+            or self.available != self._was_available
+            or not changed.isdisjoint(watched)
+            or not changed.isdisjoint(self._last_watched)
+        ):
+            self._remember_written_state()
+            self._attributes = None
+            if self.coordinator.stats is not None:
+                self.coordinator.stats.record_entity_write()
+            super()._handle_coordinator_update()
@@ -0,0 +1,167 @@
+"""Wear forecasting from rolling mileage statistics."""
+from collections import namedtuple
+from datetime import timedelta
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from .const import DOMAIN
+from .thresholds import limit_for
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 30
+
+# Days of daily mileage samples kept per component
+WINDOW_DAYS = 60
+
+# Replacement dates further out than this are not projected
+HORIZON_DAYS = 10 * 365
+
+Forecast = namedtuple(
+    "Forecast", ["km_per_day", "limit_km", "remaining_km", "replacement_date"]
+)
+
+
+def wear_store(hass, entry_id):
+    """Return the store holding an entry's mileage samples."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.wear")
+
+
+def parse_limits(text):
+    """Parse "Chain=3000, Cassette=10000" into {"Chain": 3000.0, ...}.
+
+    Keys are component types or component IDs.
+
+    Raises ValueError on malformed input.
+    """
+    limits = {}
+    for part in (text or "").replace("\n", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        key, sep, value = part.partition("=")
+        if not sep or not key.strip():
+            raise ValueError(f"Invalid limit: {part}")
+        limit = float(value)
+        if limit <= 0:
+            raise ValueError(f"Limit must be positive: {part}")
+        limits[key.strip()] = limit
+    return limits
+
+
+def format_limits(limits):
+    """Format limits back into the "Type=km" text used by the options flow."""
+    return ", ".join(f"{key}={value:g}" for key, value in limits.items())
+
+
+class WearForecaster:
+    """Usage rate and replacement forecast for every component.
+
+    One daily mileage sample per component is kept for a rolling window.
+    All components are evaluated in a single pass per refresh, and the
+    results are looked up by the sensors in O(1).
+    """
+
+    def __init__(self, hass, entry_id, limits):
+        self._store = wear_store(hass, entry_id)
+        self.limits = limits
+        # comp_id -> [[day ordinal, km], ...], oldest first
+        self._samples = {}
+        self.forecasts = {}
+        self._evaluated = None
+
+    async def async_load(self):
+        data = await self._store.async_load() or {}
+        self._samples = data.get("samples") or {}
+
+    @callback
+    def _async_save(self):
+        self._store.async_delay_save(lambda: {"samples": self._samples}, SAVE_DELAY)
+
+    def update(self, index, partial=False):
+        """Record today's mileage and recompute all forecasts.
+
+        Samples of components missing from a ``partial`` snapshot, one
+        without the gear of athletes that could not be fetched, are kept.
+        Returns the IDs of components whose forecast changed.
+        """
+        today = dt_util.now().date()
+        # Nothing to do for an identical snapshot on the same day
+        if self._evaluated == (index, today):
+            return set()
+        self._evaluated = (index, today)
+        today_ordinal = today.toordinal()
+        cutoff = today_ordinal - WINDOW_DAYS
+        forecasts = {}
+        sampled = False
+
+        for comp in index:
+            if not comp.get("component", False):
+                continue
+            comp_id = comp["id"]
+            km = comp.km
+            if km is None:
+                continue
+
+            samples = self._samples.setdefault(comp_id, [])
+            if samples and samples[-1][0] == today_ordinal:
+                if samples[-1][1] != km:
+                    samples[-1][1] = km
+                    sampled = True
+            else:
+                samples.append([today_ordinal, km])
+                sampled = True
+            while len(samples) > 1 and samples[0][0] < cutoff:
+                samples.pop(0)
+
+            forecasts[comp_id] = self._forecast(comp, km, samples, today)
+
+        # Forget components that no longer exist
+        for comp_id in [cid for cid in self._samples if cid not in forecasts and not partial]:
+            del self._samples[comp_id]
+            sampled = True
+
+        changed = {
+            comp_id for comp_id in forecasts.keys() | self.forecasts.keys()
+            if forecasts.get(comp_id) != self.forecasts.get(comp_id)
+        }
+        self.forecasts = forecasts
+        if sampled:
+            self._async_save()
+        return changed
+
+    def _forecast(self, comp, km, samples, today):
+        km_per_day = None
+        span = samples[-1][0] - samples[0][0]
+        if span > 0:
+            km_per_day = round(max(samples[-1][1] - samples[0][1], 0) / span, 2)
+
+        limit = limit_for(self.limits, comp)
+        if limit is None:
+            return Forecast(km_per_day, None, None, None)
+
+        remaining = round(limit - km, 1)
+        if remaining <= 0:
+            replacement = today
+        elif km_per_day and remaining / km_per_day <= HORIZON_DAYS:
+            replacement = today + timedelta(days=round(remaining / km_per_day))
+        else:
+            # Too slow to project; far enough out it could overflow the date
+            replacement = None
+        return Forecast(km_per_day, limit, remaining, replacement)
+
+    def attributes(self, comp_id):
+        """Return forecast state attributes for a component."""
+        forecast = self.forecasts.get(comp_id)
+        if forecast is None:
+            return {}
+        return {
+            "usage_km_per_day": forecast.km_per_day,
+            "wear_limit_km": forecast.limit_km,
+            "remaining_km": forecast.remaining_km,
+            "projected_replacement": (
+                forecast.replacement_date.isoformat() if forecast.replacement_date else None
+            ),
+        }
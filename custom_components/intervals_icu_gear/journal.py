@@ -0,0 +1,150 @@
+"""Durable queue of component changes replayed against Intervals.icu."""
+import asyncio
+from datetime import timedelta
+import aiohttp
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from .const import DOMAIN
+from .services import EVENT_COMPONENT_EQUIPPED
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 5
+
+# Backoff between replay attempts while Intervals.icu is unreachable
+RETRY_BASE = timedelta(seconds=30)
+RETRY_MAX = timedelta(hours=1)
+
+
+def journal_store(hass, entry_id):
+    """Return the store holding an entry's queued component changes."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.journal")
+
+
+class CommandJournal:
+    """Pending component lists per bike, persisted until Intervals.icu accepts them.
+
+    Only the latest requested component list is kept for each bike, so any
+    number of queued changes to one bike is sent as a single PUT. Pending
+    lists are laid over every fetched snapshot until they have been applied.
+    """
+
+    def __init__(self, hass, entry_id, client):
+        self.hass = hass
+        self._store = journal_store(hass, entry_id)
+        self.client = client
+        # bike_id -> {"component_ids": [...], "queued_at": iso, "attempts": n}
+        self.pending = {}
+        self._wake = asyncio.Event()
+        self._failures = 0
+
+    async def async_load(self):
+        data = await self._store.async_load() or {}
+        self.pending = data.get("pending") or {}
+        if self.pending:
+            _LOGGER.info("Replaying %d queued Intervals.icu gear changes", len(self.pending))
+            self._wake.set()
+
+    def _data(self):
+        return {"pending": self.pending}
+
+    async def async_enqueue(self, changes):
+        """Persist new component lists ({bike_id: ids}) and schedule them for sending."""
+        queued_at = dt_util.utcnow().isoformat()
+        for bike_id, component_ids in changes.items():
+            self.pending[bike_id] = {
+                "component_ids": list(component_ids),
+                "queued_at": queued_at,
+                "attempts": 0,
+            }
+        # Written right away: the caller is told the change is safe
+        await self._store.async_save(self._data())
+        self._wake.set()
+
+    def overlay(self, index):
+        """Return the snapshot with pending component lists applied."""
+        if not self.pending:
+            return index
+        patched = [
+            {**index.get(bike_id), "component_ids": command["component_ids"]}
+            for bike_id, command in self.pending.items()
+            if bike_id in index.by_id
+        ]
+        return index.with_gear(*patched) if patched else index
+
+    async def async_run(self, coordinator):
+        """Send pending changes until the entry is unloaded."""
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            try:
+                delay = await self._async_flush(coordinator)
+            except Exception:
+                # Keep the queue alive; the change stays pending for the retry
+                _LOGGER.exception("Unexpected error sending queued gear changes")
+                self._failures += 1
+                delay = self._retry_delay()
+            if delay is not None:
+                _LOGGER.debug("Retrying queued gear changes in %s", delay)
+                await asyncio.sleep(delay.total_seconds())
+                self._wake.set()
+
+    async def _async_flush(self, coordinator):
+        """Send every pending change; return a retry delay if the API is unavailable."""
+        for bike_id, command in list(self.pending.items()):
+            component_ids = command["component_ids"]
+            athlete_id = coordinator.data.athlete_of(bike_id) if coordinator.data else None
+            try:
+                response = await self.client.async_update_bike_components(
+                    bike_id, component_ids, athlete_id
+                )
+            except aiohttp.ClientResponseError as err:
+                if err.status == 429 or err.status >= 500:
+                    return self._async_retry_later(command, err)
+                # Rejected for good; drop it and resync the real state
+                _LOGGER.warning("Intervals.icu rejected queued change for %s: %s", bike_id, err)
+                self._async_finish(bike_id, command)
+                self._fire(bike_id, component_ids, "failed", err)
+                await coordinator.async_request_refresh()
+                continue
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                return self._async_retry_later(command, err)
+
+            self._failures = 0
+            self._async_finish(bike_id, command)
+            if coordinator.data is not None and bike_id in coordinator.data.by_id:
+                bike = coordinator.data.get(bike_id)
+                if isinstance(response, dict) and response.get("id") == bike_id:
+                    bike = response
+                coordinator.async_set_updated_data(
+                    self.overlay(coordinator.data.with_gear(bike))
+                )
+            self._fire(bike_id, component_ids, "updated")
+        return None
+
+    @callback
+    def _async_retry_later(self, command, err):
+        self._failures += 1
+        command["attempts"] += 1
+        self._store.async_delay_save(self._data, SAVE_DELAY)
+        _LOGGER.warning("Could not send queued gear change, will retry: %s", err)
+        return self._retry_delay()
+
+    def _retry_delay(self):
+        return min(RETRY_BASE * 2 ** (self._failures - 1), RETRY_MAX)
+
+    @callback
+    def _async_finish(self, bike_id, command):
+        # A newer change queued while this one was in flight stays pending
+        if self.pending.get(bike_id) is command:
+            del self.pending[bike_id]
+        self._store.async_delay_save(self._data, SAVE_DELAY)
+
+    def _fire(self, bike_id, component_ids, status, err=None):
+        data = {"bike_id": bike_id, "component_ids": component_ids, "status": status}
+        if err is not None:
+            data["error"] = str(err)
+        self.hass.bus.async_fire(EVENT_COMPONENT_EQUIPPED, data)
@@ -0,0 +1,119 @@
+"""Local ledger of when components were fitted to and removed from gear."""
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from .const import DOMAIN
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+
+# Install and remove events kept for diagnostics, newest last
+EVENT_LIMIT = 500
+
+
+def ledger_store(hass, entry_id):
+    """Return the store holding an entry's component install ledger."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.ledger")
+
+
+class InstallLedger:
+    """Where each component is fitted, since when and at what mileage.
+
+    Installs and removals are found by comparing which gear each component
+    is equipped on between snapshots, whether they came from a poll or from
+    a local change such as the equip service. The component's distance at
+    that moment is recorded, so the distance since it was installed is a
+    subtraction. Components already fitted when the ledger first sees them
+    have an unknown install date and distance.
+    """
+
+    def __init__(self, hass, entry_id):
+        self._store = ledger_store(hass, entry_id)
+        # comp_id -> {"gear_id": ..., "installed_on": iso or None, "km": km or None}
+        self.installs = {}
+        # [[iso, "install" | "remove", comp_id, gear_id, km, source], ...]
+        self.events = []
+        self._initialized = False
+        self._evaluated = None
+
+    async def async_load(self):
+        data = await self._store.async_load() or {}
+        self.installs = data.get("installs") or {}
+        self.events = data.get("events") or []
+        self._initialized = bool(data.get("initialized"))
+
+    @callback
+    def _async_save(self):
+        self._store.async_delay_save(
+            lambda: {
+                "initialized": self._initialized,
+                "installs": self.installs,
+                "events": self.events,
+            },
+            SAVE_DELAY,
+        )
+
+    def update(self, index, source="poll", partial=False):
+        """Record installs and removals since the last snapshot.
+
+        A ``partial`` snapshot lacks the gear of athletes that could not be
+        fetched, so components missing from it are not taken as removed.
+        Returns the IDs of components whose install changed.
+        """
+        # An empty gear list is a glitch, not every component being removed
+        if self._evaluated == index or not len(index):
+            return set()
+        self._evaluated = index
+        now = dt_util.utcnow().isoformat()
+        changed = set()
+
+        for comp_id, gear in index.parent_of.items():
+            install = self.installs.get(comp_id)
+            if install is not None and install["gear_id"] == gear["id"]:
+                continue
+            if install is not None:
+                self._event(now, "remove", comp_id, install["gear_id"], index, source)
+            if self._initialized:
+                km = index.get(comp_id).km
+                self.installs[comp_id] = {"gear_id": gear["id"], "installed_on": now, "km": km}
+                self._event(now, "install", comp_id, gear["id"], index, source)
+            else:
+                # Fitted before we were watching
+                self.installs[comp_id] = {"gear_id": gear["id"], "installed_on": None, "km": None}
+            changed.add(comp_id)
+
+        for comp_id in [cid for cid in self.installs if cid not in index.parent_of]:
+            if partial and comp_id not in index.by_id:
+                continue
+            install = self.installs.pop(comp_id)
+            if comp_id in index.by_id:
+                self._event(now, "remove", comp_id, install["gear_id"], index, source)
+            changed.add(comp_id)
+
+        if changed or not self._initialized:
+            self._initialized = True
+            del self.events[:-EVENT_LIMIT]
+            self._async_save()
+        return changed
+
+    def _event(self, now, action, comp_id, gear_id, index, source):
+        _LOGGER.debug("Component %s: %s on %s (%s)", comp_id, action, gear_id, source)
+        self.events.append([now, action, comp_id, gear_id, index.get(comp_id).km, source])
+
+    def attributes(self, index, comp_id):
+        """Return install state attributes for a component.
+
+        The component may already be gone from the snapshot, as its entity
+        gets one more update before it is removed.
+        """
+        install = self.installs.get(comp_id)
+        if install is None:
+            return {"installed_on": None, "distance_since_installed_km": None}
+        km = index.get(comp_id).km
+        since = None
+        if install["km"] is not None and km is not None:
+            since = round(max(km - install["km"], 0), 1)
+        return {"installed_on": install["installed_on"], "distance_since_installed_km": since}
@@ -0,0 +1,259 @@
+"""Indexed snapshot of the Intervals.icu gear list."""
+import sys
+from types import MappingProxyType
+
+# Fields of the API's gear objects that the integration reads; everything
+# else in the payload is dropped when it is parsed
+GEAR_FIELDS = (
+    "id",
+    "name",
+    "type",
+    "component",
+    "distance",
+    "time",
+    "activities",
+    "component_ids",
+    "retired",
+    # Athlete the gear was fetched for; only set in coach mode
+    "athlete",
+)
+
+
+class GearRecord:
+    """One gear item with only the fields the integration uses.
+
+    Reads like a read-only mapping (``get``, ``[]``, ``keys``) so code can
+    treat it like the API's dict. Missing and null fields are the same here.
+    ``km`` is the distance in kilometres, rounded once when parsed.
+    """
+
+    __slots__ = GEAR_FIELDS + ("km", "fingerprint")
+
+    def __init__(self, data, athlete=None):
+        get = data.get
+        self.id = get("id")
+        self.name = get("name")
+        gear_type = get("type")
+        # Types repeat across hundreds of items; share one string per type
+        self.type = sys.intern(gear_type) if isinstance(gear_type, str) else gear_type
+        self.component = get("component")
+        self.distance = get("distance")
+        self.time = get("time")
+        self.activities = get("activities")
+        component_ids = get("component_ids")
+        self.component_ids = tuple(component_ids) if component_ids is not None else None
+        self.retired = get("retired")
+        self.athlete = get("athlete") or athlete
+        self.km = round(self.distance / 1000, 1) if self.distance is not None else None
+        self.fingerprint = hash(tuple(getattr(self, field) for field in GEAR_FIELDS))
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None) if key in GEAR_FIELDS else None
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def keys(self):
+        return dict.fromkeys(
+            field for field in GEAR_FIELDS if getattr(self, field) is not None
+        ).keys()
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __eq__(self, other):
+        if not isinstance(other, GearRecord):
+            return NotImplemented
+        # The hash settles most comparisons; equal hashes are confirmed
+        # field by field so a collision cannot hide a change
+        return self is other or (
+            self.fingerprint == other.fingerprint
+            and all(getattr(self, field) == getattr(other, field) for field in GEAR_FIELDS)
+        )
+
+    def __hash__(self):
+        return self.fingerprint
+
+    def __repr__(self):
+        return f"GearRecord({self.as_dict()!r})"
+
+    def as_dict(self):
+        """Return the record as a JSON-serialisable dict."""
+        data = {field: self.get(field) for field in self.keys()}
+        if "component_ids" in data:
+            data["component_ids"] = list(data["component_ids"])
+        return data
+
+
+EMPTY = GearRecord({})
+
+
+def parse_gear(gear_list, athlete=None):
+    """Parse the API's gear list into records, tagged with the athlete if given."""
+    return tuple(
+        g if isinstance(g, GearRecord) else GearRecord(g, athlete) for g in gear_list or ()
+    )
+
+
+def _slot_sort_key(comp):
+    return comp.get("id", "")
+
+
+class GearIndex:
+    """Immutable lookup tables built once per coordinator refresh.
+
+    Entities read from these tables instead of scanning the gear list, so
+    every property lookup is O(1) regardless of fleet size.
+    """
+
+    __slots__ = (
+        "gear", "by_id", "by_type", "parent_of", "equipped", "slots", "fingerprint",
+    )
+
+    def __init__(self, gear_list=None):
+        gear = parse_gear(gear_list)
+        by_id = {g["id"]: g for g in gear}
+        by_type = {}
+        parent_of = {}
+        equipped = {}
+        slots = {}
+
+        for g in gear:
+            by_type.setdefault(g.get("type"), []).append(g)
+            if g.get("component", False):
+                continue
+
+            comps = tuple(
+                by_id[cid] for cid in g.get("component_ids") or [] if cid in by_id
+            )
+            equipped[g["id"]] = comps
+
+            comps_by_type = {}
+            for comp in comps:
+                # First gear listing the component wins, as with a linear scan
+                parent_of.setdefault(comp["id"], g)
+                comps_by_type.setdefault(comp.get("type", "Component"), []).append(comp)
+
+            # Sort by ID for consistent slot assignment
+            for comp_type, items in comps_by_type.items():
+                items.sort(key=_slot_sort_key)
+                slots[(g["id"], comp_type)] = tuple(items)
+
+        self.gear = gear
+        self.by_id = MappingProxyType(by_id)
+        self.by_type = MappingProxyType({t: tuple(items) for t, items in by_type.items()})
+        self.parent_of = MappingProxyType(parent_of)
+        self.equipped = MappingProxyType(equipped)
+        self.slots = MappingProxyType(slots)
+        self.fingerprint = hash(tuple((gid, g.fingerprint) for gid, g in by_id.items()))
+
+    def __eq__(self, other):
+        if not isinstance(other, GearIndex):
+            return NotImplemented
+        return self is other or (
+            self.fingerprint == other.fingerprint and self.by_id == other.by_id
+        )
+
+    def __hash__(self):
+        return self.fingerprint
+
+    def __iter__(self):
+        return iter(self.gear)
+
+    def __len__(self):
+        return len(self.gear)
+
+    def get(self, gear_id):
+        """Return the gear record for an ID, or an empty record."""
+        return self.by_id.get(gear_id, EMPTY)
+
+    def components_of(self, gear_id):
+        """Return the components equipped on a gear item."""
+        return self.equipped.get(gear_id, ())
+
+    def slot_components(self, gear_id, comp_type):
+        """Return the components of one type on a gear item, in slot order."""
+        return self.slots.get((gear_id, comp_type), ())
+
+    def component_at(self, gear_id, comp_type, slot_index):
+        """Return the component in a 1-based slot, or None if the slot is empty."""
+        comps = self.slots.get((gear_id, comp_type), ())
+        if 0 < slot_index <= len(comps):
+            return comps[slot_index - 1]
+        return None
+
+    def athlete_of(self, gear_id):
+        """Return the athlete a gear item belongs to in coach mode, else None."""
+        return self.get(gear_id).athlete
+
+    def is_inactive(self, gear):
+        """Whether gear is retired, or a spare component that has never been used."""
+        if gear.get("retired"):
+            return True
+        return (
+            gear.get("component", False)
+            and gear["id"] not in self.parent_of
+            and not gear.get("distance")
+            and not gear.get("activities")
+        )
+
+    def equipped_on(self, comp_id):
+        """Return the gear a component is currently equipped on, or None."""
+        return self.parent_of.get(comp_id)
+
+    def changed_since(self, previous):
+        """Return the IDs of gear added, removed or modified since another snapshot."""
+        if previous is None:
+            return frozenset(self.by_id)
+        old = previous.by_id
+        new = self.by_id
+        # Record equality checks the fingerprints first
+        changed = {gid for gid, g in new.items() if old.get(gid) != g}
+        changed.update(gid for gid in old if gid not in new)
+        return frozenset(changed)
+
+    def with_gear(self, *updated):
+        """Return a new snapshot with some gear records or dicts replaced or added."""
+        replace = {}
+        for g in updated:
+            if not isinstance(g, GearRecord):
+                # PUT responses and patches do not carry the athlete tag
+                g = GearRecord(g, self.get(g["id"]).athlete)
+            replace[g["id"]] = g
+        gear = [replace.pop(g["id"], g) for g in self.gear]
+        gear.extend(replace.values())
+        return GearIndex(gear)
+
+    def equip_component_ids(self, bike_id, comp_id, exclusive=False, component_ids=None):
+        """Return the bike's component_ids after equipping a component.
+
+        Pass component_ids to chain several changes on the same bike.
+        """
+        if component_ids is None:
+            component_ids = self.get(bike_id).get("component_ids") or []
+        component_ids = list(component_ids)
+        if exclusive:
+            comp_type = self.get(comp_id).get("type")
+            component_ids = [
+                cid for cid in component_ids
+                if cid not in self.by_id or self.by_id[cid].get("type") != comp_type
+            ]
+        if comp_id not in component_ids:
+            component_ids.append(comp_id)
+        return component_ids
+
+    def unequip_component_ids(self, bike_id, comp_id, component_ids=None):
+        """Return the bike's component_ids after removing a component."""
+        if component_ids is None:
+            component_ids = self.get(bike_id).get("component_ids") or []
+        return [cid for cid in component_ids if cid != comp_id]
@@ -0,0 +1,98 @@
+"""Adaptive polling schedule for the gear coordinator."""
+from datetime import timedelta
+import random
+from homeassistant.util import dt as dt_util
+
+DEFAULT_INTERVAL = timedelta(hours=1)
+# Poll quickly for a while after a ride or an equip call
+ACTIVE_INTERVAL = timedelta(minutes=10)
+ACTIVE_WINDOW = timedelta(hours=3)
+# Back off when nothing changed for days
+IDLE_INTERVAL = timedelta(hours=6)
+IDLE_AFTER = timedelta(days=3)
+# Safety-net poll when rides are pushed through the webhook
+PUSH_INTERVAL = timedelta(hours=6)
+# Exponential backoff on errors
+ERROR_BASE = timedelta(minutes=2)
+ERROR_MAX = timedelta(hours=2)
+JITTER = 0.2
+
+REASON_DEFAULT = "default"
+REASON_STAGGER = "stagger"
+REASON_ACTIVE = "recent_activity"
+REASON_IDLE = "idle"
+REASON_ERROR = "error_backoff"
+REASON_PUSH = "push"
+
+
+class PollScheduler:
+    """Decide how long to wait before the next poll, and why."""
+
+    def __init__(self, stagger=timedelta(0), push=False):
+        self._stagger = stagger
+        # With webhook push, polling only catches missed notifications
+        self.push = push
+        self.base_interval = PUSH_INTERVAL if push else DEFAULT_INTERVAL
+        self.last_change = dt_util.utcnow()
+        self.active_until = None
+        self.active_reason = None
+        self.consecutive_errors = 0
+        self.interval = self.base_interval + stagger
+        self.reason = REASON_STAGGER if stagger else REASON_DEFAULT
+
+    def note_activity(self, reason):
+        """Poll faster for a while, e.g. after a distance change or equip call."""
+        now = dt_util.utcnow()
+        self.last_change = now
+        self.active_until = now + ACTIVE_WINDOW
+        self.active_reason = reason
+
+    def on_success(self, distance_changed=False, changed=False):
+        """Recompute the interval after a successful poll."""
+        self.consecutive_errors = 0
+        now = dt_util.utcnow()
+        if distance_changed:
+            self.note_activity("distance_changed")
+        elif changed:
+            self.last_change = now
+
+        if self._stagger:
+            # The first poll after setup keeps the offset that separates
+            # this entry's phase from the other entries, even after errors
+            self._set(self.base_interval + self._stagger, REASON_STAGGER)
+            self._stagger = timedelta(0)
+            return self.interval
+
+        if self.push:
+            self._set(PUSH_INTERVAL, REASON_PUSH)
+        elif self.active_until is not None and now < self.active_until:
+            self._set(ACTIVE_INTERVAL, REASON_ACTIVE)
+        elif now - self.last_change > IDLE_AFTER:
+            self._set(IDLE_INTERVAL, REASON_IDLE)
+        else:
+            self._set(DEFAULT_INTERVAL, REASON_DEFAULT)
+        return self.interval
+
+    def on_error(self):
+        """Back off exponentially, with jitter, after a failed poll."""
+        self.consecutive_errors += 1
+        backoff = min(ERROR_BASE * 2 ** (self.consecutive_errors - 1), ERROR_MAX)
+        backoff *= random.uniform(1 - JITTER, 1 + JITTER)
+        self._set(backoff, REASON_ERROR)
+        return self.interval
+
+    def _set(self, interval, reason):
+        self.interval = interval
+        self.reason = reason
+
+    def as_dict(self):
+        """Return the scheduler state for diagnostics."""
+        return {
+            "interval_seconds": round(self.interval.total_seconds()),
+            "reason": self.reason,
+            "push": self.push,
+            "consecutive_errors": self.consecutive_errors,
+            "last_change": self.last_change.isoformat(),
+            "active_until": self.active_until.isoformat() if self.active_until else None,
+            "active_reason": self.active_reason,
+        }
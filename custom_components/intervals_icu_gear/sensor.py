@@ -1,11 +1,10 @@
-from datetime import timedelta
 from homeassistant.components.sensor import SensorEntity, SensorDeviceClass, SensorStateClass
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, CoordinatorEntity
 from homeassistant.helpers.device_registry import DeviceEntryType
-from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.const import UnitOfLength
-from .const import DOMAIN, CONF_API_KEY, CONF_ATHLETE_ID
-from .api import IntervalsICUClient
+from homeassistant.const import EntityCategory, UnitOfLength, UnitOfTime
+from .const import DOMAIN
+from .entity import IntervalsICUGearEntity, async_track_gear_entities, tracked_gear
+from .usage import USAGE_WINDOW_DAYS
+from functools import partial
 import logging
 
 _LOGGER = logging.getLogger(__name__)
@@ -65,132 +64,174 @@ ICON_MAP = {
 DEFAULT_ICON = "mdi:cog"
 
 
+# Identifiers and lists that rarely change or are bulky; they stay on the
+# state but are not written to the recorder database
+UNRECORDED_GEAR_ATTRIBUTES = frozenset({
+    "gear_id",
+    "gear_type",
+    "component_ids",
+    "equipped_components",
+    "equipped_by_type",
+})
+UNRECORDED_COMPONENT_ATTRIBUTES = frozenset({
+    "gear_id",
+    "component_id",
+    "component_name",
+    "component_type",
+    "equipped_on_id",
+    "equipped_on_name",
+    "equipped_on_type",
+    "wear_limit_km",
+})
+
+
 def get_icon_for_type(gear_type: str) -> str:
     """Get MDI icon for gear type."""
     return ICON_MAP.get(gear_type, DEFAULT_ICON)
 
 
-async def async_setup_entry(hass, entry, async_add_entities):
-    api_key = entry.data[CONF_API_KEY]
-    athlete_id = entry.data[CONF_ATHLETE_ID]
-    client = IntervalsICUClient(api_key, athlete_id)
-
-    async def async_update_data():
-        try:
-            data = await client.async_get_gear()
-            _LOGGER.debug("Intervals.icu API returned %d items", len(data) if data else 0)
-            return data if data else []
-        except Exception as err:
-            _LOGGER.error("Error fetching Intervals.icu gear data: %s", err)
-            raise
-
-    coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        name="intervals_icu_gear",
-        update_method=async_update_data,
-        update_interval=timedelta(hours=1),
-    )
+def _recent_usage(coordinator, gear_id):
+    """Return recent-distance attributes when activity sync is enabled."""
+    if coordinator.usage is None:
+        return {}
+    return {f"distance_{USAGE_WINDOW_DAYS}d_km": coordinator.usage.recent_km.get(gear_id, 0.0)}
 
-    await coordinator.async_config_entry_first_refresh()
 
-    if coordinator.data is None:
-        _LOGGER.error("Failed to fetch gear data from Intervals.icu API")
-        raise ConfigEntryNotReady("Could not fetch gear data from Intervals.icu")
+def _install(coordinator, comp_id):
+    """Return when and at what mileage a component was fitted, from the ledger."""
+    if coordinator.ledger is None:
+        return {}
+    return coordinator.ledger.attributes(coordinator.data, comp_id)
 
-    # Store coordinator in hass.data so the service can access it
-    hass.data[DOMAIN]["coordinator"] = coordinator
 
-    entities = []
+def _wear_forecast(coordinator, comp_id):
+    """Return wear forecast attributes for a component."""
+    if coordinator.forecaster is None:
+        return {}
+    return coordinator.forecaster.attributes(comp_id)
 
-    # Build a lookup of all gear by ID
-    gear_by_id = {g["id"]: g for g in coordinator.data}
 
-    for gear in coordinator.data:
-        is_component = gear.get("component", False)
+def _entity_factories(coordinator):
+    """Yield (unique_id, factory) for every sensor the current snapshot calls for."""
+    index = coordinator.data
 
-        _LOGGER.debug("Processing gear: %s, type: %s, is_component: %s",
-                      gear.get("name"), gear.get("type"), is_component)
+    # Retired gear and spares still in their box add listeners and state
+    # writes for nothing; they get entities once used, or when included
+    for gear in tracked_gear(coordinator):
+        is_component = gear.get("component", False)
 
         if not is_component:
             # Create mileage entity for main gear (bikes, shoes, etc.)
-            entities.append(IntervalsICUGearMileageSensor(coordinator, gear))
+            yield (
+                IntervalsICUGearMileageSensor.unique_id_for(gear),
+                partial(IntervalsICUGearMileageSensor, coordinator, gear),
+            )
 
-            # For bikes, create sensors for each equipped component
+            # For bikes, create sensors for each equipped component; bikes
+            # without components get no slot sensors
             if gear.get("type") == "Bike":
-                component_ids = gear.get("component_ids") or []
-
-                # Group components by type to determine if numbering is needed
-                components_by_type = {}
-                for comp_id in component_ids:
-                    comp = gear_by_id.get(comp_id)
-                    if comp:
-                        comp_type = comp.get("type", "Component")
-                        if comp_type not in components_by_type:
-                            components_by_type[comp_type] = []
-                        components_by_type[comp_type].append(comp)
+                component_types = dict.fromkeys(
+                    comp.get("type", "Component") for comp in index.components_of(gear["id"])
+                )
 
                 # Create sensors with numbered suffixes only when multiple of same type
-                for comp_type, comps in components_by_type.items():
-                    # Sort by ID for consistent slot assignment
-                    comps.sort(key=lambda c: c.get("id", ""))
+                for comp_type in component_types:
+                    comps = index.slot_components(gear["id"], comp_type)
                     needs_numbering = len(comps) > 1
                     for idx, comp in enumerate(comps, start=1):
                         suffix = f"_{idx}" if needs_numbering else ""
-                        # Sensor showing equipped component name
-                        entities.append(IntervalsICUEquippedComponentSensor(
-                            coordinator, gear, comp, comp_type, suffix, idx
-                        ))
-                        # Sensor showing equipped component mileage
-                        entities.append(IntervalsICUEquippedComponentMileageSensor(
-                            coordinator, gear, comp, comp_type, suffix, idx
-                        ))
+                        # Sensor showing equipped component name, then its mileage
+                        for sensor_class in (
+                            IntervalsICUEquippedComponentSensor,
+                            IntervalsICUEquippedComponentMileageSensor,
+                        ):
+                            yield (
+                                sensor_class.unique_id_for(gear, comp_type, suffix),
+                                partial(sensor_class, coordinator, gear, comp, comp_type, suffix, idx),
+                            )
         else:
             # Create entity for components (chains, tyres, cassettes, etc.)
-            entities.append(IntervalsICUComponentSensor(coordinator, gear))
+            yield (
+                IntervalsICUComponentSensor.unique_id_for(gear),
+                partial(IntervalsICUComponentSensor, coordinator, gear),
+            )
+
+
+def _build_entities(coordinator):
+    """Build every sensor the current snapshot calls for."""
+    return [factory() for _, factory in _entity_factories(coordinator)]
+
+
+def _build_diagnostic_entities(entry, stats):
+    return [
+        sensor_class(entry, stats)
+        for sensor_class in (
+            IntervalsICUApiLatencySensor,
+            IntervalsICURefreshDurationSensor,
+            IntervalsICUEntityWritesSensor,
+            IntervalsICUApiErrorsSensor,
+        )
+    ]
+
 
-    _LOGGER.info("Created %d Intervals.icu gear entities", len(entities))
-    async_add_entities(entities)
+async def async_setup_entry(hass, entry, async_add_entities):
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    coordinator = entry_data["coordinator"]
+    # Performance sensors live on a per-entry device and never go stale
+    diagnostics = _build_diagnostic_entities(entry, entry_data["stats"])
+    async_add_entities(diagnostics)
+
+    async_track_gear_entities(
+        hass,
+        entry,
+        coordinator,
+        async_add_entities,
+        _entity_factories,
+        "sensor",
+        keep={entity.unique_id for entity in diagnostics},
+    )
 
 
-class IntervalsICUGearMileageSensor(CoordinatorEntity, SensorEntity):
+class IntervalsICUGearMileageSensor(IntervalsICUGearEntity, SensorEntity):
     """Mileage sensor for main gear (bikes, shoes, etc.)."""
 
     _attr_device_class = SensorDeviceClass.DISTANCE
     _attr_state_class = SensorStateClass.TOTAL
     _attr_native_unit_of_measurement = UnitOfLength.KILOMETERS
     _attr_has_entity_name = True
+    _unrecorded_attributes = UNRECORDED_GEAR_ATTRIBUTES
+
+    @staticmethod
+    def unique_id_for(gear):
+        return f"intervals_icu_gear_{gear['id']}_mileage"
 
     def __init__(self, coordinator, gear):
         super().__init__(coordinator)
         self._gear_id = gear["id"]
         self._gear_type = gear.get("type", "Gear")
         self._gear_name = gear.get("name", "Unknown")
-        self._attr_unique_id = f"intervals_icu_gear_{gear['id']}_mileage"
+        self._attr_unique_id = self.unique_id_for(gear)
         self._attr_icon = get_icon_for_type(self._gear_type)
 
     @property
     def _gear(self):
         """Get current gear data from coordinator."""
-        for g in self.coordinator.data or []:
-            if g["id"] == self._gear_id:
-                return g
-        return {}
+        return self.coordinator.data.get(self._gear_id)
+
+    def _watched_ids(self):
+        return [self._gear_id, *(c["id"] for c in self.coordinator.data.components_of(self._gear_id))]
 
     def _get_equipped_components(self):
         """Get list of equipped components with their details."""
-        gear = self._gear
-        component_ids = gear.get("component_ids") or []
-        components = []
-        for g in self.coordinator.data or []:
-            if g["id"] in component_ids:
-                components.append({
-                    "id": g["id"],
-                    "name": g.get("name"),
-                    "type": g.get("type"),
-                    "distance_km": round(g.get("distance", 0) / 1000, 1) if g.get("distance") else None,
-                })
-        return components
+        return [
+            {
+                "id": g["id"],
+                "name": g.get("name"),
+                "type": g.get("type"),
+                "distance_km": g.km or None,
+            }
+            for g in self.coordinator.data.components_of(self._gear_id)
+        ]
 
     @property
     def name(self):
@@ -198,43 +239,40 @@ class IntervalsICUGearMileageSensor(CoordinatorEntity, SensorEntity):
 
     @property
     def device_info(self):
-        gear = self._gear
-        return {
-            "identifiers": {(DOMAIN, self._gear_id)},
-            "name": gear.get("name", self._gear_name),
-            "manufacturer": "Intervals.icu",
-            "model": gear.get("type", self._gear_type),
-            "entry_type": DeviceEntryType.SERVICE,
-        }
+        return self._gear_device_info(self._gear_id, self._gear_name, self._gear_type)
 
-    @property
-    def extra_state_attributes(self):
+    def _compute_attributes(self):
         gear = self._gear
-        equipped = self._get_equipped_components()
-        # Build a dict of component type -> name for easy reference
-        equipped_by_type = {c["type"]: c["name"] for c in equipped}
-        return {
+        attributes = {
             "gear_id": gear.get("id"),
             "gear_type": gear.get("type"),
             "activities": gear.get("activities"),
             "time_seconds": gear.get("time"),
             "component_ids": gear.get("component_ids") or [],
-            "equipped_components": equipped,
-            "equipped_by_type": equipped_by_type,
+            **_recent_usage(self.coordinator, self._gear_id),
         }
+        if not self.coordinator.compact_attributes:
+            equipped = self._get_equipped_components()
+            attributes["equipped_components"] = equipped
+            # Build a dict of component type -> name for easy reference
+            attributes["equipped_by_type"] = {c["type"]: c["name"] for c in equipped}
+        return attributes
 
     @property
     def native_value(self):
-        distance = self._gear.get("distance")
-        if distance is not None:
-            return round(distance / 1000, 1)
-        return None
+        return self._gear.km
 
 
-class IntervalsICUEquippedComponentSensor(CoordinatorEntity, SensorEntity):
+class IntervalsICUEquippedComponentSensor(IntervalsICUGearEntity, SensorEntity):
     """Sensor showing the name of the equipped component of a specific type on a bike."""
 
     _attr_has_entity_name = True
+    _unrecorded_attributes = UNRECORDED_COMPONENT_ATTRIBUTES
+
+    @staticmethod
+    def unique_id_for(gear, comp_type, suffix):
+        # Based on gear, component TYPE and slot - not the actual component ID
+        return f"intervals_icu_gear_{gear['id']}_equipped_{comp_type}{suffix}"
 
     def __init__(self, coordinator, gear, component, comp_type, suffix, slot_index):
         super().__init__(coordinator)
@@ -244,32 +282,22 @@ class IntervalsICUEquippedComponentSensor(CoordinatorEntity, SensorEntity):
         self._component_type = comp_type
         self._slot_index = slot_index  # Which slot (1, 2, etc.) for this type
         self._suffix = suffix
-        # Unique ID based on gear, component TYPE and slot - not the actual component ID
-        self._attr_unique_id = f"intervals_icu_gear_{gear['id']}_equipped_{comp_type}{suffix}"
+        self._attr_unique_id = self.unique_id_for(gear, comp_type, suffix)
         self._attr_icon = get_icon_for_type(self._component_type)
 
     @property
     def _gear(self):
-        for g in self.coordinator.data or []:
-            if g["id"] == self._gear_id:
-                return g
-        return {}
+        return self.coordinator.data.get(self._gear_id)
+
+    def _watched_ids(self):
+        comp = self._get_equipped_component()
+        return [self._gear_id, comp["id"]] if comp else [self._gear_id]
 
     def _get_equipped_component(self):
         """Get the equipped component at this slot."""
-        gear = self._gear
-        component_ids = gear.get("component_ids") or []
-        # Find all components of this type equipped on this bike
-        matching_comps = []
-        for g in self.coordinator.data or []:
-            if g["id"] in component_ids and g.get("type") == self._component_type:
-                matching_comps.append(g)
-        # Sort by ID for consistent slot assignment
-        matching_comps.sort(key=lambda c: c.get("id", ""))
-        # Return the component at this slot index (1-based)
-        if self._slot_index <= len(matching_comps):
-            return matching_comps[self._slot_index - 1]
-        return None
+        return self.coordinator.data.component_at(
+            self._gear_id, self._component_type, self._slot_index
+        )
 
     @property
     def name(self):
@@ -277,23 +305,17 @@ class IntervalsICUEquippedComponentSensor(CoordinatorEntity, SensorEntity):
 
     @property
     def device_info(self):
-        gear = self._gear
-        return {
-            "identifiers": {(DOMAIN, self._gear_id)},
-            "name": gear.get("name", self._gear_name),
-            "manufacturer": "Intervals.icu",
-            "model": gear.get("type", self._gear_type),
-            "entry_type": DeviceEntryType.SERVICE,
-        }
+        return self._gear_device_info(self._gear_id, self._gear_name, self._gear_type)
 
-    @property
-    def extra_state_attributes(self):
+    def _compute_attributes(self):
         comp = self._get_equipped_component()
         if comp:
             return {
                 "component_id": comp.get("id"),
                 "component_name": comp.get("name"),
                 "component_type": comp.get("type"),
+                # Shows when the component in this slot was swapped
+                "installed_on": _install(self.coordinator, comp["id"]).get("installed_on"),
             }
         return {}
 
@@ -305,13 +327,18 @@ class IntervalsICUEquippedComponentSensor(CoordinatorEntity, SensorEntity):
         return None
 
 
-class IntervalsICUEquippedComponentMileageSensor(CoordinatorEntity, SensorEntity):
+class IntervalsICUEquippedComponentMileageSensor(IntervalsICUGearEntity, SensorEntity):
     """Sensor showing the mileage of the equipped component of a specific type on a bike."""
 
     _attr_device_class = SensorDeviceClass.DISTANCE
     _attr_state_class = SensorStateClass.TOTAL
     _attr_native_unit_of_measurement = UnitOfLength.KILOMETERS
     _attr_has_entity_name = True
+    _unrecorded_attributes = UNRECORDED_COMPONENT_ATTRIBUTES
+
+    @staticmethod
+    def unique_id_for(gear, comp_type, suffix):
+        return f"intervals_icu_gear_{gear['id']}_equipped_{comp_type}{suffix}_mileage"
 
     def __init__(self, coordinator, gear, component, comp_type, suffix, slot_index):
         super().__init__(coordinator)
@@ -321,32 +348,22 @@ class IntervalsICUEquippedComponentMileageSensor(CoordinatorEntity, SensorEntity
         self._component_type = comp_type
         self._slot_index = slot_index
         self._suffix = suffix
-        # Unique ID based on gear, component TYPE and slot - not the actual component ID
-        self._attr_unique_id = f"intervals_icu_gear_{gear['id']}_equipped_{comp_type}{suffix}_mileage"
+        self._attr_unique_id = self.unique_id_for(gear, comp_type, suffix)
         self._attr_icon = get_icon_for_type(self._component_type)
 
     @property
     def _gear(self):
-        for g in self.coordinator.data or []:
-            if g["id"] == self._gear_id:
-                return g
-        return {}
+        return self.coordinator.data.get(self._gear_id)
+
+    def _watched_ids(self):
+        comp = self._get_equipped_component()
+        return [self._gear_id, comp["id"]] if comp else [self._gear_id]
 
     def _get_equipped_component(self):
         """Get the equipped component at this slot."""
-        gear = self._gear
-        component_ids = gear.get("component_ids") or []
-        # Find all components of this type equipped on this bike
-        matching_comps = []
-        for g in self.coordinator.data or []:
-            if g["id"] in component_ids and g.get("type") == self._component_type:
-                matching_comps.append(g)
-        # Sort by ID for consistent slot assignment
-        matching_comps.sort(key=lambda c: c.get("id", ""))
-        # Return the component at this slot index (1-based)
-        if self._slot_index <= len(matching_comps):
-            return matching_comps[self._slot_index - 1]
-        return None
+        return self.coordinator.data.component_at(
+            self._gear_id, self._component_type, self._slot_index
+        )
 
     @property
     def name(self):
@@ -354,17 +371,9 @@ class IntervalsICUEquippedComponentMileageSensor(CoordinatorEntity, SensorEntity
 
     @property
     def device_info(self):
-        gear = self._gear
-        return {
-            "identifiers": {(DOMAIN, self._gear_id)},
-            "name": gear.get("name", self._gear_name),
-            "manufacturer": "Intervals.icu",
-            "model": gear.get("type", self._gear_type),
-            "entry_type": DeviceEntryType.SERVICE,
-        }
+        return self._gear_device_info(self._gear_id, self._gear_name, self._gear_type)
 
-    @property
-    def extra_state_attributes(self):
+    def _compute_attributes(self):
         comp = self._get_equipped_component()
         if comp:
             return {
@@ -373,6 +382,9 @@ class IntervalsICUEquippedComponentMileageSensor(CoordinatorEntity, SensorEntity
                 "component_type": comp.get("type"),
                 "activities": comp.get("activities"),
                 "time_seconds": comp.get("time"),
+                **_recent_usage(self.coordinator, comp["id"]),
+                **_wear_forecast(self.coordinator, comp["id"]),
+                **_install(self.coordinator, comp["id"]),
             }
         return {}
 
@@ -380,42 +392,44 @@ class IntervalsICUEquippedComponentMileageSensor(CoordinatorEntity, SensorEntity
     def native_value(self):
         comp = self._get_equipped_component()
         if comp:
-            distance = comp.get("distance")
-            if distance is not None:
-                return round(distance / 1000, 1)
+            return comp.km
         return None
 
 
-class IntervalsICUComponentSensor(CoordinatorEntity, SensorEntity):
+class IntervalsICUComponentSensor(IntervalsICUGearEntity, SensorEntity):
     """Mileage sensor for components (chains, tyres, cassettes, etc.)."""
 
     _attr_device_class = SensorDeviceClass.DISTANCE
     _attr_state_class = SensorStateClass.TOTAL
     _attr_native_unit_of_measurement = UnitOfLength.KILOMETERS
     _attr_has_entity_name = True
+    _unrecorded_attributes = UNRECORDED_COMPONENT_ATTRIBUTES
+
+    @staticmethod
+    def unique_id_for(comp):
+        return f"intervals_icu_component_{comp['id']}_mileage"
 
     def __init__(self, coordinator, comp):
         super().__init__(coordinator)
         self._comp_id = comp["id"]
         self._comp_type = comp.get("type", "Component")
         self._comp_name = comp.get("name", "Unknown")
-        self._attr_unique_id = f"intervals_icu_component_{comp['id']}_mileage"
+        self._attr_unique_id = self.unique_id_for(comp)
         self._attr_icon = get_icon_for_type(self._comp_type)
 
     @property
     def _comp(self):
-        for g in self.coordinator.data or []:
-            if g["id"] == self._comp_id:
-                return g
-        return {}
+        return self.coordinator.data.get(self._comp_id)
+
+    def _watched_ids(self):
+        parent = self.coordinator.data.equipped_on(self._comp_id)
+        return [self._comp_id, parent["id"]] if parent else [self._comp_id]
 
     def _get_equipped_on(self):
         """Find which gear this component is currently equipped on."""
-        for g in self.coordinator.data or []:
-            if not g.get("component", False):
-                component_ids = g.get("component_ids") or []
-                if self._comp_id in component_ids:
-                    return {"id": g["id"], "name": g.get("name"), "type": g.get("type")}
+        g = self.coordinator.data.equipped_on(self._comp_id)
+        if g is not None:
+            return {"id": g["id"], "name": g.get("name"), "type": g.get("type")}
         return None
 
     @property
@@ -424,32 +438,131 @@ class IntervalsICUComponentSensor(CoordinatorEntity, SensorEntity):
 
     @property
     def device_info(self):
+        return self._gear_device_info(self._comp_id, self._comp_name, self._comp_type)
+
+    def _compute_attributes(self):
         comp = self._comp
+        equipped_on = self._get_equipped_on()
+        attributes = {
+            "gear_id": comp.get("id"),
+            "component_type": comp.get("type"),
+            "activities": comp.get("activities"),
+            "time_seconds": comp.get("time"),
+            "equipped_on_id": equipped_on["id"] if equipped_on else None,
+            **_recent_usage(self.coordinator, self._comp_id),
+            **_wear_forecast(self.coordinator, self._comp_id),
+            **_install(self.coordinator, self._comp_id),
+        }
+        if not self.coordinator.compact_attributes:
+            attributes["equipped_on_name"] = equipped_on["name"] if equipped_on else None
+            attributes["equipped_on_type"] = equipped_on["type"] if equipped_on else None
+        return attributes
+
+    @property
+    def native_value(self):
+        return self._comp.km
+
+
+class IntervalsICUDiagnosticSensor(SensorEntity):
+    """Performance counter of one config entry, updated after each refresh."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _unrecorded_attributes = frozenset({"endpoints", "histogram"})
+    _key = None
+
+    def __init__(self, entry, stats):
+        self._entry = entry
+        self._stats = stats
+        self._attr_unique_id = f"intervals_icu_{entry.entry_id}_{self._key}"
+
+    @property
+    def device_info(self):
         return {
-            "identifiers": {(DOMAIN, self._comp_id)},
-            "name": comp.get("name", self._comp_name),
+            "identifiers": {(DOMAIN, self._entry.entry_id)},
+            "name": f"Intervals.icu {self._entry.title}",
             "manufacturer": "Intervals.icu",
-            "model": comp.get("type", self._comp_type),
+            "model": "API connection",
             "entry_type": DeviceEntryType.SERVICE,
         }
 
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        self.async_on_remove(self._stats.async_add_listener(self.async_write_ha_state))
+
+
+class IntervalsICUApiLatencySensor(IntervalsICUDiagnosticSensor):
+    _key = "api_latency"
+    _attr_name = "API latency"
+    _attr_icon = "mdi:timer-outline"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    @property
+    def native_value(self):
+        return self._stats.last_latency_ms
+
     @property
     def extra_state_attributes(self):
-        comp = self._comp
-        equipped_on = self._get_equipped_on()
         return {
-            "gear_id": comp.get("id"),
-            "component_type": comp.get("type"),
-            "activities": comp.get("activities"),
-            "time_seconds": comp.get("time"),
-            "equipped_on_id": equipped_on["id"] if equipped_on else None,
-            "equipped_on_name": equipped_on["name"] if equipped_on else None,
-            "equipped_on_type": equipped_on["type"] if equipped_on else None,
+            "requests": self._stats.requests,
+            "last_response_bytes": self._stats.last_response_bytes,
+            "last_json_decode_ms": self._stats.last_decode_ms,
+            "endpoints": {ep: h.as_dict() for ep, h in self._stats.latency.items()},
         }
 
+
+class IntervalsICURefreshDurationSensor(IntervalsICUDiagnosticSensor):
+    _key = "refresh_duration"
+    _attr_name = "Refresh duration"
+    _attr_icon = "mdi:refresh"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
     @property
     def native_value(self):
-        distance = self._comp.get("distance")
-        if distance is not None:
-            return round(distance / 1000, 1)
-        return None
+        return self._stats.last_refresh_ms
+
+    @property
+    def extra_state_attributes(self):
+        return {
+            "refreshes": self._stats.refreshes,
+            "last_refresh_success": self._stats.last_refresh_success,
+            "last_gear_parse_ms": self._stats.last_parse_ms,
+            "last_index_build_ms": self._stats.last_index_ms,
+            "histogram": self._stats.refresh.as_dict(),
+        }
+
+
+class IntervalsICUEntityWritesSensor(IntervalsICUDiagnosticSensor):
+    _key = "entity_writes"
+    _attr_name = "Entity writes per refresh"
+    _attr_icon = "mdi:database-edit-outline"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    @property
+    def native_value(self):
+        return self._stats.last_refresh_writes
+
+    @property
+    def extra_state_attributes(self):
+        return {"entity_writes_total": self._stats.entity_writes_total}
+
+
+class IntervalsICUApiErrorsSensor(IntervalsICUDiagnosticSensor):
+    _key = "api_errors"
+    _attr_name = "API errors"
+    _attr_icon = "mdi:alert-circle-outline"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    @property
+    def native_value(self):
+        return self._stats.error_count
+
+    @property
+    def extra_state_attributes(self):
+        return {"errors": dict(self._stats.errors), "retries": self._stats.retries}
@@ -0,0 +1,245 @@
+# Services for equipping and removing Intervals.icu components
+
+import asyncio
+import aiohttp
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from .const import DOMAIN
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+EQUIP_SERVICE = "equip_component"
+PLAN_SERVICE = "apply_gear_plan"
+
+EVENT_COMPONENT_EQUIPPED = f"{DOMAIN}_component_equipped"
+
+# Number of bikes updated at the same time by apply_gear_plan
+PLAN_CONCURRENCY = 4
+
+EQUIP_SCHEMA = vol.Schema({
+    vol.Required("bike_device_id"): cv.string,
+    vol.Required("component_device_id"): cv.string,
+    vol.Optional("exclusive", default=False): bool,
+})
+
+PLAN_OPERATION_SCHEMA = vol.Schema({
+    vol.Required("bike_device_id"): cv.string,
+    vol.Required("component_device_id"): cv.string,
+    vol.Optional("action", default="equip"): vol.In(["equip", "unequip"]),
+    vol.Optional("exclusive", default=False): bool,
+})
+
+PLAN_SCHEMA = vol.Schema({
+    vol.Required("operations"): vol.All(cv.ensure_list, [PLAN_OPERATION_SCHEMA]),
+})
+
+
+def _resolve_device(hass, device_reg, device_id):
+    """Return (entry_id, gear_id) for a device, or (None, None).
+
+    The entry is the loaded config entry that owns the device, so calls are
+    routed to the right account when several are configured.
+    """
+    device = device_reg.async_get(device_id)
+    if not device:
+        return None, None
+    entries = hass.data.get(DOMAIN, {})
+    entry_id = next((eid for eid in device.config_entries if eid in entries), None)
+    # Identifiers are stored as {(DOMAIN, gear_id)}
+    for domain, identifier in device.identifiers:
+        if domain == DOMAIN:
+            return entry_id, identifier
+    return None, None
+
+
+async def _async_get_snapshot(coordinator, gear_ids, allow_stale=False):
+    """Return a snapshot containing gear_ids, refetching only when needed."""
+    index = coordinator.data
+    stale = coordinator.snapshot_is_stale and not allow_stale
+    if stale or index is None or any(gid not in index.by_id for gid in gear_ids):
+        _LOGGER.debug("Gear snapshot stale, refreshing before update")
+        await coordinator.async_refresh()
+        index = coordinator.data
+    return index
+
+
+def _equip_mutation(bike_id, comp_id, exclusive):
+    """Return a change that equips a component on a bike."""
+    def mutate(index, component_ids):
+        return index.equip_component_ids(bike_id, comp_id, exclusive, component_ids)
+    return mutate
+
+
+def _plan_mutation(bike_id, operations):
+    """Return a change that applies a plan's operations on one bike, in order."""
+    def mutate(index, component_ids):
+        for comp_id, op in operations:
+            if op["action"] == "unequip":
+                component_ids = index.unequip_component_ids(bike_id, comp_id, component_ids)
+            else:
+                component_ids = index.equip_component_ids(
+                    bike_id, comp_id, op["exclusive"], component_ids
+                )
+        return component_ids
+    return mutate
+
+
+def async_register_services(hass: HomeAssistant) -> None:
+    """Register the integration's services."""
+
+    async def async_equip_component_service(call: ServiceCall):
+        exclusive = call.data.get("exclusive", False)
+
+        # Get device registry to resolve device IDs to gear IDs
+        device_reg = dr.async_get(hass)
+        bike_entry_id, bike_gear_id = _resolve_device(hass, device_reg, call.data["bike_device_id"])
+        comp_entry_id, comp_gear_id = _resolve_device(
+            hass, device_reg, call.data["component_device_id"]
+        )
+        if not bike_gear_id or not comp_gear_id:
+            raise ValueError("Could not resolve gear IDs from device identifiers")
+        if bike_entry_id is None or bike_entry_id != comp_entry_id:
+            raise ValueError("Bike and component must belong to the same loaded Intervals.icu account")
+
+        coordinator = hass.data[DOMAIN][bike_entry_id]["coordinator"]
+        journal = hass.data[DOMAIN][bike_entry_id].get("journal")
+        writes = hass.data[DOMAIN][bike_entry_id]["writes"]
+
+        # Resolve both items from the cached snapshot, refetching only if it
+        # is stale or does not know them yet. Queued mode trusts the snapshot,
+        # which already carries the pending changes.
+        index = await _async_get_snapshot(
+            coordinator, (bike_gear_id, comp_gear_id), allow_stale=journal is not None
+        )
+        bike = index.by_id.get(bike_gear_id)
+        component = index.by_id.get(comp_gear_id)
+        if not bike or not component:
+            raise ValueError("Bike or component not found in Intervals.icu gear list")
+        bike_id = bike["id"]
+
+        # Calls for the same bike are serialized and close ones share one PUT;
+        # in queued mode the event fires once Intervals.icu accepts the change
+        try:
+            status, component_ids, _ = await writes.async_apply(
+                bike_id, _equip_mutation(bike_id, component["id"], exclusive)
+            )
+        except aiohttp.ClientResponseError as err:
+            raise HomeAssistantError(f"Intervals.icu rejected the update: {err}") from err
+
+        if status == "updated":
+            hass.bus.async_fire(EVENT_COMPONENT_EQUIPPED, {
+                "bike_id": bike_id,
+                "component_ids": component_ids,
+                "status": status,
+            })
+        return {"bike_id": bike_id, "status": status, "component_ids": component_ids}
+
+    async def _async_apply_plan(entry_id, operations):
+        """Apply one account's share of a gear plan; return per-bike results."""
+        coordinator = hass.data[DOMAIN][entry_id]["coordinator"]
+        journal = hass.data[DOMAIN][entry_id].get("journal")
+        writes = hass.data[DOMAIN][entry_id]["writes"]
+
+        index = await _async_get_snapshot(
+            coordinator,
+            {gid for bike, comp, _ in operations for gid in (bike, comp)},
+            allow_stale=journal is not None,
+        )
+
+        # Group the operations per bike; each bike gets one folded change
+        by_bike = {}
+        for bike_id, comp_id, op in operations:
+            if bike_id not in index.by_id or comp_id not in index.by_id:
+                raise ValueError(f"Gear {bike_id} or {comp_id} not found in Intervals.icu gear list")
+            by_bike.setdefault(bike_id, []).append((comp_id, op))
+
+        semaphore = asyncio.Semaphore(PLAN_CONCURRENCY)
+        written = []
+
+        async def _async_apply(bike_id, bike_operations):
+            mutate = _plan_mutation(bike_id, bike_operations)
+            async with semaphore:
+                try:
+                    # Already folded, so there is nothing to wait for; the
+                    # written bikes are published together below
+                    status, component_ids, bike = await writes.async_apply(
+                        bike_id, mutate, window=0, publish=False
+                    )
+                except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as err:
+                    # One bike failing must not cost the plan the others' results
+                    _LOGGER.warning("Failed to update components of %s: %r", bike_id, err)
+                    planned = mutate(index, list(index.get(bike_id).get("component_ids") or []))
+                    return bike_id, "failed", planned, err
+            if bike is not None:
+                written.append(bike)
+            return bike_id, status, component_ids, None
+
+        try:
+            outcomes = await asyncio.gather(
+                *(_async_apply(bike_id, ops) for bike_id, ops in by_bike.items())
+            )
+        finally:
+            # One coordinator update for the whole plan
+            writes.async_publish(written)
+
+        results = {}
+        for bike_id, status, component_ids, err in outcomes:
+            results[bike_id] = {"status": status, "component_ids": component_ids}
+            if err is not None:
+                results[bike_id]["error"] = str(err) or type(err).__name__
+            if status in ("updated", "failed"):
+                hass.bus.async_fire(EVENT_COMPONENT_EQUIPPED, {
+                    "bike_id": bike_id,
+                    "component_ids": component_ids,
+                    "status": status,
+                })
+        return results
+
+    async def async_apply_gear_plan_service(call: ServiceCall):
+        device_reg = dr.async_get(hass)
+
+        # Group operations by the account that owns the devices
+        operations_by_entry = {}
+        for op in call.data["operations"]:
+            bike_entry_id, bike_gear_id = _resolve_device(hass, device_reg, op["bike_device_id"])
+            comp_entry_id, comp_gear_id = _resolve_device(
+                hass, device_reg, op["component_device_id"]
+            )
+            if not bike_gear_id or not comp_gear_id:
+                raise ValueError(
+                    f"Could not resolve gear IDs for {op['bike_device_id']} / "
+                    f"{op['component_device_id']}"
+                )
+            if bike_entry_id is None or bike_entry_id != comp_entry_id:
+                raise ValueError(
+                    f"Bike {bike_gear_id} and component {comp_gear_id} must belong to "
+                    "the same loaded Intervals.icu account"
+                )
+            operations_by_entry.setdefault(bike_entry_id, []).append(
+                (bike_gear_id, comp_gear_id, op)
+            )
+
+        results = {}
+        for entry_results in await asyncio.gather(
+            *(_async_apply_plan(eid, ops) for eid, ops in operations_by_entry.items())
+        ):
+            results.update(entry_results)
+        return {"results": results}
+
+    hass.services.async_register(
+        DOMAIN,
+        EQUIP_SERVICE,
+        async_equip_component_service,
+        schema=EQUIP_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        PLAN_SERVICE,
+        async_apply_gear_plan_service,
+        schema=PLAN_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,140 @@
+"""Long-term statistics import of per-gear distance."""
+import asyncio
+from datetime import date, timedelta
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.const import UnitOfLength
+from homeassistant.core import callback
+from homeassistant.util import dt as dt_util, slugify
+from .const import DOMAIN
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def statistic_id_for(gear_id):
+    """Return the external statistic ID holding a gear item's distance."""
+    return f"{DOMAIN}:{slugify(gear_id)}_distance"
+
+
+def _hour(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+class StatisticsImporter:
+    """Writes cumulative distance per gear item into long-term statistics.
+
+    Each gear item gets an external statistic whose ``sum`` is its total
+    distance in km. A row is added for the current hour whenever the
+    distance changed since the last imported row, so years of history stay
+    a handful of rows per ride. The first import of a statistic backfills
+    one row per day from the activity usage store when it is enabled.
+    """
+
+    def __init__(self, hass, usage=None):
+        self.hass = hass
+        self.usage = usage
+        # statistic_id -> sum of the last imported row
+        self._last_sum = None
+        self._lock = asyncio.Lock()
+
+    async def _async_load_last_sums(self, gear_ids):
+        statistic_ids = [statistic_id_for(gear_id) for gear_id in gear_ids]
+
+        def _load():
+            last = {}
+            for statistic_id in statistic_ids:
+                rows = get_last_statistics(self.hass, 1, statistic_id, False, {"sum"})
+                if rows.get(statistic_id):
+                    last[statistic_id] = rows[statistic_id][0]["sum"]
+            return last
+
+        return await get_instance(self.hass).async_add_executor_job(_load)
+
+    async def async_import(self, index, changed_ids=None):
+        """Import rows for gear whose distance changed; None checks all gear."""
+        async with self._lock:
+            if self._last_sum is None:
+                self._last_sum = await self._async_load_last_sums(index.by_id)
+            now_hour = _hour(dt_util.utcnow())
+            imported = 0
+            for gear in index:
+                gear_id = gear["id"]
+                if changed_ids is not None and gear_id not in changed_ids:
+                    continue
+                distance = gear.get("distance")
+                if distance is None:
+                    continue
+                km = round(distance / 1000, 3)
+                statistic_id = statistic_id_for(gear_id)
+                last_sum = self._last_sum.get(statistic_id)
+                if last_sum is not None and round(last_sum, 3) == km:
+                    continue
+
+                rows = []
+                if last_sum is None:
+                    rows.extend(self._backfill_rows(gear_id, km, now_hour))
+                rows.append(StatisticData(start=now_hour, state=km, sum=km))
+                async_add_external_statistics(self.hass, self._metadata(gear), rows)
+                self._last_sum[statistic_id] = km
+                imported += 1
+            if imported:
+                _LOGGER.debug("Imported distance statistics for %d gear items", imported)
+
+    def _backfill_rows(self, gear_id, km, now_hour):
+        """Reconstruct end-of-day totals from the daily usage buckets."""
+        if self.usage is None:
+            return []
+        daily = self.usage.daily(gear_id)
+        if not daily:
+            return []
+        today = dt_util.now().date().isoformat()
+        rows = []
+        # Walk back from today's total, subtracting each later day's distance
+        total = km - sum(v[0] for d, v in daily.items() if d >= today)
+        for day in sorted((d for d in daily if d < today), reverse=True):
+            # The last whole UTC hour of the local day; local midnight is off
+            # the hour in half-hour timezones and 23:00 moves on DST days
+            end = dt_util.start_of_local_day(date.fromisoformat(day) + timedelta(days=1))
+            start = _hour(dt_util.as_utc(end) - timedelta(hours=1))
+            if start >= now_hour:
+                continue
+            value = round(max(total, 0), 3)
+            rows.append(StatisticData(start=start, state=value, sum=value))
+            total -= daily[day][0]
+        rows.reverse()
+        return rows
+
+    @staticmethod
+    def _metadata(gear):
+        return StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name=f"{gear.get('name') or gear['id']} distance",
+            source=DOMAIN,
+            statistic_id=statistic_id_for(gear["id"]),
+            unit_of_measurement=UnitOfLength.KILOMETERS,
+        )
+
+
+@callback
+def async_setup_statistics(hass, entry, coordinator, usage=None):
+    """Import distance statistics now and after every snapshot change."""
+    importer = StatisticsImporter(hass, usage)
+
+    @callback
+    def _async_import(changed_ids=None):
+        entry.async_create_background_task(
+            hass,
+            importer.async_import(coordinator.data, changed_ids),
+            f"{DOMAIN} statistics import",
+        )
+
+    _async_import()
+    entry.async_on_unload(
+        coordinator.async_add_listener(lambda: _async_import(coordinator.changed_ids))
+    )
@@ -0,0 +1,140 @@
+"""Lightweight performance counters for the client and coordinator."""
+from homeassistant.core import callback
+
+# Upper bounds (ms) of the request latency histogram buckets
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class _Histogram:
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value_ms):
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if value_ms <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.total += value_ms
+        self.max = max(self.max, value_ms)
+
+    def as_dict(self):
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [
+            f">{LATENCY_BUCKETS_MS[-1]}ms"
+        ]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count, 1) if self.count else None,
+            "max_ms": round(self.max, 1),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class PerfStats:
+    """Request, refresh and entity-write counters for one config entry.
+
+    Recording is a few additions per event so it can stay on in production;
+    listeners (the diagnostic sensors) are notified once per refresh.
+    """
+
+    def __init__(self):
+        self.latency = {}
+        self.last_latency_ms = None
+        self.last_response_bytes = None
+        self.response_bytes_total = 0
+        self.requests = 0
+        self.errors = {}
+        self.retries = 0
+        self.last_decode_ms = None
+        self.last_parse_ms = None
+        self.last_index_ms = None
+        self.refresh = _Histogram()
+        self.last_refresh_ms = None
+        self.last_refresh_success = None
+        self.refreshes = 0
+        self.pending_writes = 0
+        self.last_refresh_writes = 0
+        self.entity_writes_total = 0
+        self._listeners = []
+
+    def record_request(self, endpoint, latency_s, size=None, decode_s=None):
+        latency_ms = latency_s * 1000
+        self.latency.setdefault(endpoint, _Histogram()).add(latency_ms)
+        self.last_latency_ms = round(latency_ms, 1)
+        self.requests += 1
+        if size is not None:
+            self.last_response_bytes = size
+            self.response_bytes_total += size
+        if decode_s is not None:
+            self.last_decode_ms = round(decode_s * 1000, 2)
+
+    def record_error(self, kind):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def record_retry(self):
+        self.retries += 1
+
+    def record_parse(self, duration_s):
+        self.last_parse_ms = round(duration_s * 1000, 2)
+
+    def record_index(self, duration_s):
+        self.last_index_ms = round(duration_s * 1000, 2)
+
+    def record_entity_write(self):
+        self.pending_writes += 1
+
+    def begin_refresh(self):
+        self.pending_writes = 0
+
+    @callback
+    def finish_refresh(self, duration_s, success):
+        """Record a completed refresh and notify listeners."""
+        duration_ms = duration_s * 1000
+        self.refresh.add(duration_ms)
+        self.last_refresh_ms = round(duration_ms, 1)
+        self.last_refresh_success = success
+        self.refreshes += 1
+        self.last_refresh_writes = self.pending_writes
+        self.entity_writes_total += self.pending_writes
+        self.pending_writes = 0
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    @property
+    def error_count(self):
+        return sum(self.errors.values())
+
+    @callback
+    def async_add_listener(self, update_callback):
+        self._listeners.append(update_callback)
+
+        def remove_listener():
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    def as_dict(self):
+        return {
+            "requests": self.requests,
+            "request_latency": {ep: h.as_dict() for ep, h in self.latency.items()},
+            "last_response_bytes": self.last_response_bytes,
+            "response_bytes_total": self.response_bytes_total,
+            "last_json_decode_ms": self.last_decode_ms,
+            "last_gear_parse_ms": self.last_parse_ms,
+            "last_index_build_ms": self.last_index_ms,
+            "refreshes": self.refreshes,
+            "refresh_duration": self.refresh.as_dict(),
+            "last_refresh_ms": self.last_refresh_ms,
+            "last_refresh_success": self.last_refresh_success,
+            "last_refresh_entity_writes": self.last_refresh_writes,
+            "entity_writes_total": self.entity_writes_total,
+            "errors": dict(self.errors),
+            "retries": self.retries,
+        }
@@ -0,0 +1,62 @@
+"""Distance and time limits for components, evaluated in one pass."""
+from collections import namedtuple
+
+Threshold = namedtuple(
+    "Threshold",
+    ["distance_km", "distance_limit_km", "hours", "time_limit_hours", "exceeded"],
+)
+
+
+def limit_for(limits, comp):
+    """Return the limit for a component, by its ID first and then by its type."""
+    return limits.get(comp["id"], limits.get(comp.get("type")))
+
+
+class ThresholdEvaluator:
+    """Which components have passed their distance or time limit.
+
+    Limits are keyed by component type (``Chain``) or component ID, an ID
+    taking precedence. Every component is checked in a single pass per
+    refresh and the binary sensors only look up the result.
+    """
+
+    def __init__(self, distance_limits, time_limits):
+        self.distance_limits = distance_limits
+        self.time_limits = time_limits
+        self.results = {}
+        self._evaluated = None
+
+    def applies_to(self, comp):
+        """Whether any limit is configured for a component."""
+        return (
+            limit_for(self.distance_limits, comp) is not None
+            or limit_for(self.time_limits, comp) is not None
+        )
+
+    def update(self, index):
+        """Re-evaluate all components; return the IDs whose result changed."""
+        if self._evaluated == index:
+            return set()
+        self._evaluated = index
+        results = {}
+        for comp in index:
+            if not comp.get("component", False) or not self.applies_to(comp):
+                continue
+            distance_limit = limit_for(self.distance_limits, comp)
+            time_limit = limit_for(self.time_limits, comp)
+            km = comp.km or 0.0
+            hours = round((comp.get("time") or 0) / 3600, 1)
+            exceeded = (distance_limit is not None and km >= distance_limit) or (
+                time_limit is not None and hours >= time_limit
+            )
+            results[comp["id"]] = Threshold(km, distance_limit, hours, time_limit, exceeded)
+
+        changed = {
+            comp_id for comp_id in results.keys() | self.results.keys()
+            if results.get(comp_id) != self.results.get(comp_id)
+        }
+        self.results = results
+        return changed
+
+    def get(self, comp_id):
+        return self.results.get(comp_id)
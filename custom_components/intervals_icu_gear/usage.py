@@ -0,0 +1,163 @@
+"""Local per-gear usage store fed by incremental activity sync."""
+from datetime import timedelta
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from .const import DOMAIN
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+
+# How far back the first sync reaches
+BACKFILL_DAYS = 365
+# Daily buckets older than this are dropped
+RETENTION_DAYS = 400
+# Window for the "recent distance" attributes
+USAGE_WINDOW_DAYS = 30
+
+
+def usage_store(hass, entry_id):
+    """Return the store holding an entry's activity usage."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.usage")
+
+
+class UsageStore:
+    """Daily distance/time per gear, built from synced activities.
+
+    Data on disk is kept compact: ``{gear_id: {"YYYY-MM-DD": [km, seconds]}}``
+    plus a cursor (start time of the newest synced activity) and the IDs of
+    activities seen at that start date, so each sync only fetches and
+    processes rides newer than the previous one.
+    """
+
+    def __init__(self, hass, entry_id):
+        self._store = usage_store(hass, entry_id)
+        self.cursor = None
+        self._cursor_ids = set()
+        self._daily = {}
+        # gear_id -> km over the last USAGE_WINDOW_DAYS
+        self.recent_km = {}
+        self._window_day = None
+
+    async def async_load(self):
+        data = await self._store.async_load() or {}
+        self.cursor = data.get("cursor")
+        self._cursor_ids = set(data.get("cursor_ids") or [])
+        self._daily = data.get("daily") or {}
+        self.update_window(force=True)
+
+    @callback
+    def _async_save(self):
+        self._store.async_delay_save(
+            lambda: {
+                "cursor": self.cursor,
+                "cursor_ids": sorted(self._cursor_ids),
+                "daily": self._daily,
+            },
+            SAVE_DELAY,
+        )
+
+    async def async_sync(self, client, index):
+        """Fetch activities newer than the cursor and attribute their usage.
+
+        The first sync only credits the gear an activity was recorded on;
+        which components were fitted back then is unknown. Later syncs cover
+        recent rides, which are also credited to the components currently
+        equipped on that gear. Returns the gear IDs whose recent distance
+        changed.
+        """
+        backfill = self.cursor is None
+        if backfill:
+            oldest = (dt_util.now() - timedelta(days=BACKFILL_DAYS)).date().isoformat()
+        else:
+            oldest = self.cursor[:10]
+        cursor_day = self.cursor[:10] if self.cursor else None
+
+        cursor = self.cursor
+        accepted = []
+        async for activity in client.async_iter_activities(oldest):
+            start = activity.get("start_date_local")
+            activity_id = activity.get("id")
+            if not start or activity_id is None:
+                continue
+            # The cursor day is fetched again; skip activities already counted
+            day = start[:10]
+            if cursor_day is not None and (
+                day < cursor_day or (day == cursor_day and activity_id in self._cursor_ids)
+            ):
+                continue
+            self._add_activity(activity, day, index, backfill)
+            accepted.append((day, activity_id))
+            if cursor is None or start > cursor:
+                cursor = start
+
+        _LOGGER.debug("Synced %d new activities since %s", len(accepted), oldest)
+        if cursor is None:
+            # Nothing ridden yet; start the next sync from today
+            cursor = dt_util.now().date().isoformat() + "T00:00:00"
+        if cursor is not None:
+            new_day = cursor[:10]
+            ids = {aid for day, aid in accepted if day == new_day}
+            if new_day == cursor_day:
+                ids |= self._cursor_ids
+            self.cursor = cursor
+            self._cursor_ids = ids
+
+        changed = set()
+        if accepted or backfill:
+            self._prune()
+            changed = self.update_window(force=True)
+            self._async_save()
+        return changed
+
+    def _add_activity(self, activity, day, index, backfill):
+        gear = activity.get("gear") or {}
+        gear_id = gear.get("id") if isinstance(gear, dict) else gear
+        if not gear_id:
+            return
+
+        km = (activity.get("distance") or 0) / 1000
+        seconds = activity.get("moving_time") or 0
+        targets = [gear_id]
+        if not backfill:
+            targets.extend(c["id"] for c in index.components_of(gear_id))
+        for target in targets:
+            bucket = self._daily.setdefault(target, {}).setdefault(day, [0.0, 0])
+            bucket[0] = round(bucket[0] + km, 3)
+            bucket[1] += seconds
+
+    def _prune(self):
+        cutoff = (dt_util.now() - timedelta(days=RETENTION_DAYS)).date().isoformat()
+        for gear_id in list(self._daily):
+            days = {d: v for d, v in self._daily[gear_id].items() if d >= cutoff}
+            if days:
+                self._daily[gear_id] = days
+            else:
+                del self._daily[gear_id]
+
+    def update_window(self, force=False):
+        """Recompute the recent-distance totals; cheap no-op within the same day.
+
+        Returns the gear IDs whose recent distance changed.
+        """
+        today = dt_util.now().date()
+        if not force and today == self._window_day:
+            return set()
+        self._window_day = today
+        cutoff = (today - timedelta(days=USAGE_WINDOW_DAYS)).isoformat()
+        previous = self.recent_km
+        self.recent_km = {
+            gear_id: round(sum(v[0] for d, v in days.items() if d >= cutoff), 1)
+            for gear_id, days in self._daily.items()
+        }
+        return {
+            gear_id for gear_id in previous.keys() | self.recent_km.keys()
+            if previous.get(gear_id) != self.recent_km.get(gear_id)
+        }
+
+    def daily(self, gear_id):
+        """Return the daily buckets for a gear item."""
+        return self._daily.get(gear_id, {})
@@ -0,0 +1,109 @@
+"""Push-triggered updates from Intervals.icu webhook notifications."""
+from http import HTTPStatus
+import hmac
+from aiohttp import web
+from aiohttp.hdrs import METH_POST
+from homeassistant.components import webhook
+from homeassistant.core import callback
+from homeassistant.helpers.network import NoURLAvailableError
+from .const import DOMAIN
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+# Event types that can change gear or mileage; others are acknowledged and ignored
+RELEVANT_EVENT_PREFIXES = ("ACTIVITY_", "GEAR_")
+# Fields a gear record needs before it is trusted without a refetch
+REQUIRED_GEAR_FIELDS = frozenset({"id", "type", "component", "distance"})
+
+
+def _complete_gear(index, records):
+    """Return the records if they can replace snapshot entries as they are."""
+    if not isinstance(records, list) or not records:
+        return None
+    for record in records:
+        if not isinstance(record, dict) or not REQUIRED_GEAR_FIELDS <= record.keys():
+            return None
+        # New gear is fetched whole, with the athlete it belongs to
+        current = index.by_id.get(record["id"])
+        if current is None:
+            return None
+        # A record missing fields we currently have is a partial update
+        if not current.keys() <= record.keys():
+            return None
+    return records
+
+
+@callback
+def async_handle_events(coordinator, events):
+    """Apply the events to the snapshot; return whether a refresh is needed."""
+    patch = []
+    refresh = False
+    for event in events:
+        if not isinstance(event, dict):
+            continue
+        athlete_id = event.get("athlete_id")
+        if athlete_id and str(athlete_id) not in (
+            coordinator.athlete_ids or (coordinator.client.athlete_id,)
+        ):
+            continue
+        event_type = str(event.get("type") or "")
+        if event_type and not event_type.startswith(RELEVANT_EVENT_PREFIXES):
+            continue
+        records = event.get("gear")
+        if isinstance(records, dict):
+            records = [records]
+        gear = _complete_gear(coordinator.data, records) if coordinator.data else None
+        if gear:
+            patch.extend(gear)
+        elif event_type or records:
+            refresh = True
+
+    if patch and not refresh:
+        _LOGGER.debug("Applying %d gear items from webhook", len(patch))
+        coordinator.async_set_updated_data(coordinator.data.with_gear(*patch))
+    return refresh
+
+
+def async_setup_webhook(hass, entry, coordinator, webhook_id, secret=None):
+    """Register the entry's webhook and unregister it on unload."""
+
+    async def _async_handle_webhook(hass, webhook_id, request):
+        try:
+            payload = await request.json()
+        except ValueError:
+            return web.Response(status=HTTPStatus.BAD_REQUEST)
+        if not isinstance(payload, dict):
+            return web.Response(status=HTTPStatus.BAD_REQUEST)
+        # compare_digest only takes ASCII strings, so compare the bytes
+        if secret and not hmac.compare_digest(
+            str(payload.get("secret", "")).encode(), secret.encode()
+        ):
+            _LOGGER.warning("Rejected Intervals.icu webhook call with a wrong secret")
+            return web.Response(status=HTTPStatus.UNAUTHORIZED)
+
+        events = payload.get("events")
+        if not isinstance(events, list):
+            events = [payload]
+        if async_handle_events(coordinator, events):
+            # Answer right away; the debounced refresh runs in the background
+            entry.async_create_background_task(
+                hass, coordinator.async_request_refresh(), f"{DOMAIN} webhook refresh"
+            )
+        return web.Response(status=HTTPStatus.OK)
+
+    webhook.async_register(
+        hass,
+        DOMAIN,
+        f"Intervals.icu Gear ({entry.title})",
+        webhook_id,
+        _async_handle_webhook,
+        allowed_methods=[METH_POST],
+    )
+    entry.async_on_unload(lambda: webhook.async_unregister(hass, webhook_id))
+
+    try:
+        url = webhook.async_generate_url(hass, webhook_id)
+    except NoURLAvailableError:
+        url = webhook.async_generate_path(webhook_id)
+    _LOGGER.info("Intervals.icu Gear webhook for %s is available at %s", entry.title, url)
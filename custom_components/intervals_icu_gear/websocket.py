@@ -0,0 +1,142 @@
+"""Websocket commands serving the whole gear fleet in one compact payload."""
+import voluptuous as vol
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from .const import DOMAIN
+from .entity import is_tracked, tracked_gear
+
+FLEET_COMMAND = f"{DOMAIN}/fleet"
+SUBSCRIBE_FLEET_COMMAND = f"{DOMAIN}/subscribe_fleet"
+
+
+def _bike(index, bike):
+    slots = {}
+    for comp in index.components_of(bike["id"]):
+        comp_type = comp.get("type", "Component")
+        if comp_type not in slots:
+            slots[comp_type] = [c["id"] for c in index.slot_components(bike["id"], comp_type)]
+    data = {"name": bike.get("name"), "type": bike.get("type"), "km": bike.km, "slots": slots}
+    if bike.athlete is not None:
+        data["athlete"] = bike.athlete
+    return data
+
+
+def _component(comp):
+    return {"name": comp.get("name"), "type": comp.get("type"), "km": comp.km}
+
+
+def _add(coordinator, gear, bikes, components):
+    """Add gear to the payload; a bike brings the components in its slots."""
+    index = coordinator.data
+    if gear.get("component", False):
+        components[gear["id"]] = _component(gear)
+        return
+    bikes[gear["id"]] = _bike(index, gear)
+    for comp in index.components_of(gear["id"]):
+        components[comp["id"]] = _component(comp)
+
+
+def fleet_summary(coordinator):
+    """Return every tracked bike and component as one compact structure.
+
+    Which gear a component is fitted to is only given by the bikes' slots,
+    so moving a component changes the bikes and not the component.
+    """
+    bikes = {}
+    components = {}
+    if coordinator.data is not None:
+        for gear in tracked_gear(coordinator):
+            _add(coordinator, gear, bikes, components)
+    return {
+        "available": coordinator.data_available,
+        "bikes": bikes,
+        "components": components,
+    }
+
+
+def fleet_delta(coordinator, changed_ids):
+    """Return the bikes and components among changed_ids, and the ones now gone."""
+    index = coordinator.data
+    bikes = {}
+    components = {}
+    removed = []
+    for gear_id in changed_ids:
+        gear = index.by_id.get(gear_id)
+        if gear is None or not is_tracked(coordinator, gear):
+            removed.append(gear_id)
+        else:
+            _add(coordinator, gear, bikes, components)
+    return {
+        "available": coordinator.data_available,
+        "bikes": bikes,
+        "components": components,
+        # A component dropped as gear may still be listed in a bike's slots
+        "removed": [gid for gid in removed if gid not in components],
+    }
+
+
+def _get_coordinator(hass, connection, msg):
+    """Return the requested entry's coordinator, or send an error and return None."""
+    entries = hass.data.get(DOMAIN, {})
+    entry_id = msg.get("entry_id")
+    if entry_id is None and len(entries) == 1:
+        entry_id = next(iter(entries))
+    if entry_id not in entries:
+        connection.send_error(
+            msg["id"],
+            websocket_api.ERR_NOT_FOUND,
+            "Unknown entry_id" if entry_id else "entry_id is required with several accounts",
+        )
+        return None
+    return entries[entry_id]["coordinator"]
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): FLEET_COMMAND,
+    vol.Optional("entry_id"): str,
+})
+@callback
+def ws_fleet(hass: HomeAssistant, connection, msg):
+    """Return the fleet summary of an account."""
+    coordinator = _get_coordinator(hass, connection, msg)
+    if coordinator is not None:
+        connection.send_result(msg["id"], fleet_summary(coordinator))
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): SUBSCRIBE_FLEET_COMMAND,
+    vol.Optional("entry_id"): str,
+})
+@callback
+def ws_subscribe_fleet(hass: HomeAssistant, connection, msg):
+    """Send the fleet summary, then one delta message per coordinator update."""
+    coordinator = _get_coordinator(hass, connection, msg)
+    if coordinator is None:
+        return
+    available = coordinator.data_available
+
+    @callback
+    def _async_send_delta():
+        nonlocal available
+        changed_ids = coordinator.changed_ids
+        if changed_ids is None:
+            event = {"fleet": fleet_summary(coordinator)}
+        elif changed_ids or coordinator.data_available != available:
+            event = {"delta": fleet_delta(coordinator, changed_ids)}
+        else:
+            return
+        available = coordinator.data_available
+        connection.send_message(websocket_api.event_message(msg["id"], event))
+
+    connection.subscriptions[msg["id"]] = coordinator.async_add_listener(_async_send_delta)
+    connection.send_result(msg["id"])
+    connection.send_message(
+        websocket_api.event_message(msg["id"], {"fleet": fleet_summary(coordinator)})
+    )
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register the fleet websocket commands."""
+    websocket_api.async_register_command(hass, ws_fleet)
+    websocket_api.async_register_command(hass, ws_subscribe_fleet)
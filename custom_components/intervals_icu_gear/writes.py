@@ -0,0 +1,142 @@
+"""Per-bike serialization and coalescing of component list changes."""
+import asyncio
+import aiohttp
+from homeassistant.core import callback
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds a change waits for others to the same bike before it is sent
+COALESCE_WINDOW = 0.5
+
+
+def patched_bike(bike, component_ids, response):
+    """Return the bike as reported by the PUT response, or patched locally."""
+    if isinstance(response, dict) and response.get("id") == bike["id"]:
+        return response
+    return {**bike, "component_ids": component_ids}
+
+
+class BikeWriteCoalescer:
+    """Applies component changes one bike at a time, merging close calls.
+
+    A change is a function ``mutate(index, component_ids)`` returning the new
+    list. A change to a bike with nothing pending or in flight is sent right
+    away. Changes that arrive while a write to the bike is in flight are
+    held for a short window and then folded in order over the bike's latest
+    list and sent as a single PUT (or one journal entry in queued mode).
+    Only one write per bike runs at a time, so no change is computed from a
+    list another call is about to replace. Every caller gets the outcome of
+    the write that carried its change.
+    """
+
+    def __init__(self, hass, coordinator, client, journal=None, window=COALESCE_WINDOW):
+        self.hass = hass
+        self.coordinator = coordinator
+        self.client = client
+        self.journal = journal
+        self.window = window
+        # bike_id -> [(mutate, publish, future), ...] not yet being written
+        self._pending = {}
+        self._locks = {}
+        # bike_id -> record written but not yet published by the caller
+        self._unpublished = {}
+
+    async def async_apply(self, bike_id, mutate, window=None, publish=True):
+        """Queue a change to a bike; return (status, component_ids, bike) once written.
+
+        ``status`` is ``updated``, ``queued`` or ``unchanged`` and ``bike`` is
+        the written record, or None if nothing was written. Pass ``window=0``
+        for a change that is already folded, such as a plan. With
+        ``publish=False`` the snapshot is left alone and the caller publishes
+        the bike with ``async_publish``, so many bikes cost one update.
+        """
+        future = self.hass.loop.create_future()
+        batch = self._pending.get(bike_id)
+        if batch is None:
+            lock = self._locks.setdefault(bike_id, asyncio.Lock())
+            if window is None:
+                # Only wait for company behind a write already in flight
+                window = self.window if lock.locked() else 0
+            batch = self._pending[bike_id] = []
+            self.hass.async_create_task(self._async_run(bike_id, batch, lock, window))
+        batch.append((mutate, publish, future))
+        return await future
+
+    @callback
+    def async_publish(self, bikes):
+        """Publish bikes written with publish=False in a single snapshot update."""
+        current = []
+        for bike in bikes:
+            # A later write to the bike has already published a newer record
+            if self._unpublished.get(bike["id"]) is bike:
+                del self._unpublished[bike["id"]]
+                current.append(bike)
+        if current:
+            self.coordinator.async_set_updated_data(self.coordinator.data.with_gear(*current))
+
+    async def _async_run(self, bike_id, batch, lock, window):
+        try:
+            if window:
+                await asyncio.sleep(window)
+            async with lock:
+                # Calls from here on start the next batch
+                if self._pending.get(bike_id) is batch:
+                    del self._pending[bike_id]
+                if len(batch) > 1:
+                    _LOGGER.debug("Coalesced %d component changes to %s", len(batch), bike_id)
+                result = await self._async_write(
+                    bike_id,
+                    [mutate for mutate, _, _ in batch],
+                    any(publish for _, publish, _ in batch),
+                )
+        except BaseException as err:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(err)
+            if not isinstance(err, Exception):
+                raise
+            return
+        for _, _, future in batch:
+            # A caller may have given up waiting; its change was still sent
+            if not future.done():
+                future.set_result(result)
+
+    async def _async_write(self, bike_id, mutations, publish):
+        index = self.coordinator.data
+        if index is None or bike_id not in index.by_id:
+            raise ValueError(f"Bike {bike_id} not found in Intervals.icu gear list")
+        # Build on a write that its caller has not published yet
+        bike = self._unpublished.get(bike_id) or index.get(bike_id)
+        current = list(bike.get("component_ids") or [])
+        component_ids = current
+        for mutate in mutations:
+            component_ids = mutate(index, component_ids)
+        if component_ids == current:
+            return "unchanged", component_ids, None
+
+        if self.journal is not None:
+            # Applied locally now; Intervals.icu is updated in the background
+            await self.journal.async_enqueue({bike_id: component_ids})
+            status, response = "queued", None
+        else:
+            try:
+                response = await self.client.async_update_bike_components(
+                    bike_id, component_ids, index.athlete_of(bike_id)
+                )
+            except aiohttp.ClientResponseError as err:
+                # Our view of the bike is probably out of date; resync
+                _LOGGER.warning("Intervals.icu rejected component update for %s: %s", bike_id, err)
+                await self.coordinator.async_request_refresh()
+                raise
+            status = "updated"
+
+        # Patch the snapshot from the PUT response instead of refetching all gear
+        written = patched_bike(bike, component_ids, response)
+        if publish:
+            self._unpublished.pop(bike_id, None)
+            # Read the snapshot again as it may have changed during the request
+            self.coordinator.async_set_updated_data(self.coordinator.data.with_gear(written))
+        else:
+            self._unpublished[bike_id] = written
+        return status, component_ids, written
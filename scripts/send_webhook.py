@@ -0,0 +1,84 @@
+"""Post sample Intervals.icu notifications to the integration's webhook.
+
+Run from the repository root, using the URL logged when the webhook
+option is enabled:
+
+    python scripts/send_webhook.py http://homeassistant.local:8123/api/webhook/<id> \\
+        --athlete i1 --event activity
+
+``activity`` should trigger one debounced refresh. ``gear`` reports a new
+distance for one gear item and nothing else; as the record is partial, it
+also triggers a refresh rather than changing the local snapshot.
+"""
+import argparse
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import aiohttp
+
+
+def _activity_event(athlete_id, gear_id):
+    return {
+        "athlete_id": athlete_id,
+        "type": "ACTIVITY_UPLOADED",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "activity": {
+            "id": "i0",
+            "type": "Ride",
+            "start_date_local": datetime.now().isoformat(timespec="seconds"),
+            "distance": 42000,
+            "moving_time": 5400,
+            "gear": {"id": gear_id} if gear_id else None,
+        },
+    }
+
+
+def _gear_event(athlete_id, gear_id, distance_km):
+    # Only the field being changed, so real gear is never overwritten
+    return {
+        "athlete_id": athlete_id,
+        "type": "GEAR_UPDATED",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "gear": {"id": gear_id, "distance": distance_km * 1000},
+    }
+
+
+def build_payload(args):
+    if args.event == "gear":
+        event = _gear_event(args.athlete, args.gear or "b-webhook", args.distance)
+    else:
+        event = _activity_event(args.athlete, args.gear)
+    payload = {"events": [event]}
+    if args.secret:
+        payload["secret"] = args.secret
+    return payload
+
+
+async def async_send(url, payload):
+    async with aiohttp.ClientSession() as session:
+        async with session.post(url, json=payload) as resp:
+            return resp.status
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("url", help="Webhook URL of the config entry")
+    parser.add_argument("--athlete", required=True, help="Athlete ID of the entry")
+    parser.add_argument("--event", choices=("activity", "gear"), default="activity")
+    parser.add_argument("--gear", help="Gear ID to reference")
+    parser.add_argument("--distance", type=float, default=1000.0, help="Gear distance (km)")
+    parser.add_argument("--secret", help="Webhook secret configured in the options")
+    parser.add_argument("--dry-run", action="store_true", help="Print the payload only")
+    args = parser.parse_args()
+
+    payload = build_payload(args)
+    if args.dry_run:
+        print(json.dumps(payload, indent=2))
+        return
+    status = asyncio.run(async_send(args.url, payload))
+    print(f"HTTP {status}")
+
+
+if __name__ == "__main__":
+    main()